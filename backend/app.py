@@ -1,13 +1,29 @@
 from flask import Blueprint, Flask, request, jsonify
 from flask_cors import CORS
+from flask.json.provider import DefaultJSONProvider
+import hashlib
 import json
+import logging
 import os
 import sys
+import threading
+import time
 import numpy as np
 import pandas as pd
-from functools import wraps
-from jose import jwt, JWTError
-from urllib.request import urlopen, Request
+from datetime import date
+from collections import deque
+from functools import singledispatch, wraps
+from cachetools import TLRUCache, TTLCache
+from werkzeug.exceptions import RequestEntityTooLarge
+import jwt
+import certifi
+import urllib3
+from urllib3.util.retry import Retry
+
+try:
+    import orjson
+except ImportError:  # falls back to the stdlib encoder below
+    orjson = None
 
 from config import Config
 from routes import health_bp, analysis_bp, preparation_bp, workflow_bp
@@ -17,181 +33,320 @@ from routes.report_routes import report_bp
 from database.analysis import init_reports_indexes
 
 
-class NumpyEncoder(json.JSONEncoder):
-    """Custom JSON encoder for numpy types"""
-    def default(self, obj):
-        if isinstance(obj, np.integer):
-            return int(obj)
-        if isinstance(obj, np.floating):
-            return float(obj)
-        if isinstance(obj, np.ndarray):
-            return obj.tolist()
-        if isinstance(obj, np.bool_):
-            return bool(obj)
-        if pd.isna(obj):
-            return None
-        return super(NumpyEncoder, self).default(obj)
+logger = logging.getLogger(__name__)
+
+# Auth0 settings are fixed for the life of the process
+AUTH0_DOMAIN = Config.AUTH0_DOMAIN
+AUTH0_AUDIENCE = Config.AUTH0_AUDIENCE
+AUTH0_ISSUER = f"https://{AUTH0_DOMAIN}/"
+AUTH0_JWKS_URL = f"https://{AUTH0_DOMAIN}/.well-known/jwks.json"
+AUTH0_USERINFO_URL = f"https://{AUTH0_DOMAIN}/userinfo"
+
+# Every endpoint in these blueprints requires a valid Auth0 token
+PROTECTED_ENDPOINT_PREFIXES = ('user.', 'reports.', 'analysis.', 'preparation.', 'workflow.')
+
+CORS_HEADERS = {
+    'Access-Control-Allow-Origin': '*',
+    'Access-Control-Allow-Headers': 'Content-Type, Authorization, X-User-Id',
+    'Access-Control-Allow-Methods': 'GET, POST, PUT, DELETE, OPTIONS'
+}
+PREFLIGHT_HEADERS = {**CORS_HEADERS, 'Access-Control-Max-Age': '3600'}
+
+# Unhandled-error logging: tracebacks for at most N errors per rolling window
+ERROR_TRACEBACKS_PER_WINDOW = 5
+ERROR_TRACEBACK_WINDOW_SECONDS = 60
+_ERROR_TIMES = deque(maxlen=10)
+
+# Keep-alive connections to Auth0, shared by the JWKS and userinfo lookups
+AUTH0_HTTP_TIMEOUT_SECONDS = 5.0
+_HTTP = urllib3.PoolManager(
+    maxsize=16,
+    retries=Retry(total=2, backoff_factor=0.1),
+    cert_reqs='CERT_REQUIRED',
+    ca_certs=certifi.where()
+)
+
+# Auth0 signing keys rarely rotate; cache them instead of fetching per request
+JWKS_TTL_SECONDS = 3600
+JWKS_MIN_REFRESH_SECONDS = 60
+_JWKS_CACHE = {'exp': 0, 'fetched_at': 0, 'keys': {}}
+_JWKS_LOCK = threading.Lock()
+
+# Verified token payloads, keyed by _token_digest(token)
+_TOKEN_CACHE = TTLCache(maxsize=10_000, ttl=300)
+_TOKEN_CACHE_LOCK = threading.Lock()
+
+# /userinfo responses and the upserted DB user per token, stored as
+# (token_exp, value) and kept for at most 5 minutes or until the token expires
+USER_CACHE_MAX_SECONDS = 300
+
+
+def _user_cache_ttu(_key, value, now):
+    return min(value[0], now + USER_CACHE_MAX_SECONDS)
+
+
+_USERINFO_CACHE = TLRUCache(maxsize=10_000, ttu=_user_cache_ttu, timer=time.time)
+_USER_DB_CACHE = TLRUCache(maxsize=10_000, ttu=_user_cache_ttu, timer=time.time)
+_USER_CACHE_LOCK = threading.Lock()
+
+@singledispatch
+def _np_default(obj):
+    """Converts values the JSON encoder can't handle natively (numpy/pandas types)"""
+    if obj is pd.NA:
+        return None
+    return DefaultJSONProvider.default(obj)
+
+
+@_np_default.register
+def _(obj: np.ndarray):
+    # orjson only encodes C-contiguous numeric arrays natively; hand strided
+    # views back as a contiguous copy rather than boxing every element via tolist()
+    if orjson is not None and obj.dtype.kind in 'biuf' and not obj.flags.c_contiguous:
+        return np.ascontiguousarray(obj)
+    return obj.tolist()
+
+
+@_np_default.register
+def _(obj: np.generic):
+    return obj.item()
+
+
+@_np_default.register
+def _(obj: np.floating):
+    return None if np.isnan(obj) else float(obj)
+
+
+@_np_default.register
+def _(obj: date):
+    # pd.NaT subclasses datetime
+    return None if obj is pd.NaT else obj.isoformat()
+
+
+class NumpyJSONProvider(DefaultJSONProvider):
+    """Stdlib JSON provider used when orjson isn't installed"""
+    default = staticmethod(_np_default)
+
+
+if orjson is not None:
+    ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_DATACLASS
+
+
+class ORJSONProvider(DefaultJSONProvider):
+    """JSON provider backed by orjson - numpy scalars/arrays are encoded natively"""
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=_np_default, option=ORJSON_OPTIONS).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, default=_np_default, option=ORJSON_OPTIONS),
+            mimetype=self.mimetype
+        )
+
+
+def _token_digest(token):
+    """Cache key for per-token state - avoids holding raw tokens in memory"""
+    return hashlib.blake2b(token.encode('utf-8'), digest_size=16).digest()
 
 
 def get_token_auth_header():
     """Obtains the Access Token from the Authorization Header"""
     auth = request.headers.get("Authorization", None)
-    print(f"🔑 Authorization header: {auth[:50] if auth else 'None'}...", file=sys.stderr)
+    # Slicing the header/token allocates, so only do it when debug logging is on
+    debug = logger.isEnabledFor(logging.DEBUG)
+    if debug:
+        logger.debug("🔑 Authorization header: %s...", auth[:50] if auth else None)
     
     if not auth:
-        print("❌ No authorization header found", file=sys.stderr)
+        logger.debug("❌ No authorization header found")
         return None
 
     parts = auth.split()
     if parts[0].lower() != "bearer":
-        print(f"❌ Invalid auth scheme: {parts[0]}", file=sys.stderr)
+        logger.debug("❌ Invalid auth scheme: %s", parts[0])
         return None
     elif len(parts) == 1:
-        print("❌ Token not found in header", file=sys.stderr)
+        logger.debug("❌ Token not found in header")
         return None
     elif len(parts) > 2:
-        print("❌ Invalid authorization header format", file=sys.stderr)
+        logger.debug("❌ Invalid authorization header format")
         return None
 
     token = parts[1]
-    print(f"✅ Token extracted: {token[:20]}...", file=sys.stderr)
+    if debug:
+        logger.debug("✅ Token extracted: %s...", token[:20])
     return token
 
 
-def verify_jwt(token):
-    """Verifies the JWT token with Auth0"""
-    try:
-        auth0_domain = os.getenv('AUTH0_DOMAIN')
-        api_audience = os.getenv('AUTH0_AUDIENCE')
-        
-        print("=" * 80, file=sys.stderr)
-        print(f"🔐 JWT VERIFICATION DEBUG", file=sys.stderr)
-        print("=" * 80, file=sys.stderr)
-        print(f"   Auth0 Domain: {auth0_domain}", file=sys.stderr)
-        print(f"   API Audience: {api_audience}", file=sys.stderr)
+def _fetch_json(url, headers=None):
+    """GET a JSON document from Auth0 over the shared connection pool"""
+    response = _HTTP.request('GET', url, headers=headers, timeout=AUTH0_HTTP_TIMEOUT_SECONDS)
+    if response.status != 200:
+        raise urllib3.exceptions.HTTPError(f"GET {url} returned HTTP {response.status}")
+    return orjson.loads(response.data) if orjson is not None else json.loads(response.data)
+
+
+def _get_jwks(force_refresh=False):
+    """Returns the cached kid -> PyJWK signing key mapping, refetching it once the TTL lapses"""
+    with _JWKS_LOCK:
+        now = time.time()
+        stale = now >= _JWKS_CACHE['exp']
+        # Forced refreshes (unknown kid) are throttled so bad tokens can't hammer Auth0
+        if force_refresh and now - _JWKS_CACHE['fetched_at'] >= JWKS_MIN_REFRESH_SECONDS:
+            stale = True
         
-        if not auth0_domain or auth0_domain == 'YOUR_AUTH0_DOMAIN':
-            print("❌ ERROR: AUTH0_DOMAIN not set properly!", file=sys.stderr)
-            return None
+        if stale:
+            logger.info("Fetching JWKS from: %s", AUTH0_JWKS_URL)
             
-        if not api_audience or api_audience == 'YOUR_API_IDENTIFIER':
-            print("❌ ERROR: AUTH0_AUDIENCE not set properly!", file=sys.stderr)
-            return None
+            jwks = _fetch_json(AUTH0_JWKS_URL)
+            # Public keys are parsed once per fetch, not once per token
+            _JWKS_CACHE['keys'] = {
+                key.key_id: key for key in jwt.PyJWKSet.from_dict(jwks).keys
+            }
+            _JWKS_CACHE['fetched_at'] = now
+            _JWKS_CACHE['exp'] = now + JWKS_TTL_SECONDS
+            logger.debug("✓ JWKS fetched successfully")
         
-        jwks_url = f"https://{auth0_domain}/.well-known/jwks.json"
-        print(f"   Fetching JWKS from: {jwks_url}", file=sys.stderr)
+        return _JWKS_CACHE['keys']
+
+
+def verify_jwt(token):
+    """Verifies the JWT token with Auth0"""
+    try:
+        logger.debug("🔐 Verifying JWT")
         
-        jsonurl = urlopen(jwks_url)
-        jwks = json.loads(jsonurl.read())
-        print(f"   ✓ JWKS fetched successfully", file=sys.stderr)
+        token_key = _token_digest(token)
+        with _TOKEN_CACHE_LOCK:
+            cached_payload = _TOKEN_CACHE.get(token_key)
+        if cached_payload and cached_payload.get('exp', 0) > time.time():
+            logger.debug("✓ Token found in verification cache")
+            return cached_payload
         
         unverified_header = jwt.get_unverified_header(token)
-        print(f"   Token header: {unverified_header}", file=sys.stderr)
+        logger.debug("Token header: %s", unverified_header)
         
-        rsa_key = {}
-        for key in jwks["keys"]:
-            if key["kid"] == unverified_header["kid"]:
-                rsa_key = {
-                    "kty": key["kty"],
-                    "kid": key["kid"],
-                    "use": key["use"],
-                    "n": key["n"],
-                    "e": key["e"]
-                }
-                print(f"   ✓ Matching RSA key found: {key['kid']}", file=sys.stderr)
-                break
+        kid = unverified_header.get("kid")
+        signing_key = _get_jwks().get(kid)
+        if not signing_key:
+            # Key may have been rotated since the last fetch
+            signing_key = _get_jwks(force_refresh=True).get(kid)
         
-        if not rsa_key:
-            print(f"   ❌ No matching RSA key found", file=sys.stderr)
+        if not signing_key:
+            logger.info("❌ No matching RSA key found for kid %s", kid)
             return None
+        logger.debug("✓ Matching RSA key found: %s", kid)
         
         payload = jwt.decode(
             token,
-            rsa_key,
+            signing_key.key,
             algorithms=["RS256"],
-            audience=api_audience,
-            issuer=f"https://{auth0_domain}/"
+            audience=AUTH0_AUDIENCE,
+            issuer=AUTH0_ISSUER
         )
         
-        print(f"   ✅ Token verified successfully!", file=sys.stderr)
-        print(f"   Payload sub: {payload.get('sub')}", file=sys.stderr)
-        print("=" * 80, file=sys.stderr)
+        with _TOKEN_CACHE_LOCK:
+            _TOKEN_CACHE[token_key] = payload
+        
+        logger.debug("✅ Token verified for sub %s", payload.get('sub'))
         
         return payload
         
-    except JWTError as e:
-        print("=" * 80, file=sys.stderr)
-        print(f"❌ JWT VERIFICATION FAILED", file=sys.stderr)
-        print(f"   Error: {str(e)}", file=sys.stderr)
-        print("=" * 80, file=sys.stderr)
+    except jwt.PyJWTError as e:
+        logger.info("❌ JWT verification failed: %s", e)
         return None
     except Exception as e:
-        print("=" * 80, file=sys.stderr)
-        print(f"❌ UNEXPECTED ERROR: {e}", file=sys.stderr)
-        print("=" * 80, file=sys.stderr)
+        logger.warning("❌ Unexpected error during JWT verification: %s", e)
         return None
 
 
+def _unauthorized(error, message):
+    response = jsonify({
+        "error": error,
+        "message": message
+    })
+    response.status_code = 401
+    response.headers['Access-Control-Allow-Origin'] = '*'
+    return response
+
+
+def _authenticate():
+    """Verify the bearer token and load the user onto the request.
+    Returns None on success, or a 401 response."""
+    logger.debug("🔒 Auth check: %s %s", request.method, request.path)
+    
+    token = get_token_auth_header()
+    
+    if not token:
+        logger.info("🔒 No token found - returning 401")
+        return _unauthorized("authorization_header_missing", "Authorization header is expected")
+    
+    payload = verify_jwt(token)
+    
+    if not payload:
+        logger.info("🔒 Token verification failed - returning 401")
+        return _unauthorized("invalid_token", "Token is invalid")
+    
+    request.current_user = payload
+    auth0_id = payload.get('sub')
+    logger.debug("🔒 Token valid - Auth0 ID: %s", auth0_id)
+    
+    cache_key = _token_digest(token)
+    token_exp = payload.get('exp', 0)
+    
+    with _USER_CACHE_LOCK:
+        cached_user = _USER_DB_CACHE.get(cache_key)
+    
+    if cached_user is not None:
+        logger.debug("🔒 User loaded from cache")
+        request.current_user_db = cached_user[1]
+        return None
+    
+    with _USER_CACHE_LOCK:
+        cached_userinfo = _USERINFO_CACHE.get(cache_key)
+    
+    if cached_userinfo is not None:
+        userinfo = cached_userinfo[1]
+    else:
+        try:
+            userinfo = _fetch_json(AUTH0_USERINFO_URL, headers={'Authorization': f'Bearer {token}'})
+            with _USER_CACHE_LOCK:
+                _USERINFO_CACHE[cache_key] = (token_exp, userinfo)
+        except Exception as e:
+            logger.warning("🔒 Could not fetch user info: %s", e)
+            userinfo = {}
+    
+    user_data = {
+        'auth0_id': auth0_id,
+        'email': userinfo.get('email') or payload.get('email'),
+        'name': userinfo.get('name') or payload.get('name'),
+        'picture': userinfo.get('picture') or payload.get('picture')
+    }
+    
+    user = create_or_update_user(user_data)
+    request.current_user_db = user
+    if user is not None:
+        with _USER_CACHE_LOCK:
+            _USER_DB_CACHE[cache_key] = (token_exp, user)
+    
+    return None
+
+
 def requires_auth(f):
-    """Decorator to require authentication for routes"""
+    """Decorator to require authentication for routes outside the protected blueprints"""
     @wraps(f)
     def decorated(*args, **kwargs):
         if request.method == 'OPTIONS':
             return '', 204
         
-        print("\n" + "🔒 " + "=" * 78, file=sys.stderr)
-        print(f"🔒 AUTH CHECK: {request.method} {request.path}", file=sys.stderr)
-        print("🔒 " + "=" * 78, file=sys.stderr)
-        
-        token = get_token_auth_header()
-        
-        if not token:
-            print("🔒 ❌ No token found - returning 401", file=sys.stderr)
-            response = jsonify({
-                "error": "authorization_header_missing",
-                "message": "Authorization header is expected"
-            })
-            response.status_code = 401
-            response.headers['Access-Control-Allow-Origin'] = '*'
-            return response
-        
-        payload = verify_jwt(token)
-        
-        if not payload:
-            print("🔒 ❌ Token verification failed - returning 401", file=sys.stderr)
-            response = jsonify({
-                "error": "invalid_token",
-                "message": "Token is invalid"
-            })
-            response.status_code = 401
-            response.headers['Access-Control-Allow-Origin'] = '*'
-            return response
-        
-        request.current_user = payload
-        auth0_id = payload.get('sub')
-        print(f"🔒 ✓ Token valid - Auth0 ID: {auth0_id}", file=sys.stderr)
-        
-        auth0_domain = os.getenv('AUTH0_DOMAIN')
-        userinfo_url = f"https://{auth0_domain}/userinfo"
-        
-        try:
-            req = Request(userinfo_url, headers={'Authorization': f'Bearer {token}'})
-            userinfo_response = urlopen(req)
-            userinfo = json.loads(userinfo_response.read())
-        except Exception as e:
-            print(f"🔒 ⚠️  Could not fetch user info: {e}", file=sys.stderr)
-            userinfo = {}
-        
-        user_data = {
-            'auth0_id': auth0_id,
-            'email': userinfo.get('email') or payload.get('email'),
-            'name': userinfo.get('name') or payload.get('name'),
-            'picture': userinfo.get('picture') or payload.get('picture')
-        }
-        
-        user = create_or_update_user(user_data)
-        request.current_user_db = user
-        print("🔒 " + "=" * 78 + "\n", file=sys.stderr)
+        # Already authenticated by the global gate
+        if not hasattr(request, 'current_user'):
+            error_response = _authenticate()
+            if error_response is not None:
+                return error_response
         
         return f(*args, **kwargs)
     
@@ -201,23 +356,25 @@ def requires_auth(f):
 def create_app():
     """Application factory pattern"""
     app = Flask(__name__)
-    app.json_encoder = NumpyEncoder
+    app.json = ORJSONProvider(app) if orjson is not None else NumpyJSONProvider(app)
     
-    import logging
     logging.basicConfig(
-        level=logging.DEBUG,
+        level=Config.LOG_LEVEL,
         format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
         stream=sys.stderr
     )
     
     app.config.from_object(Config)
+    # Werkzeug rejects oversized bodies (by Content-Length or while streaming) before they're buffered
+    app.config['MAX_CONTENT_LENGTH'] = Config.MAX_FILE_SIZE
     
-    print("\n" + "🚀 " + "=" * 78, file=sys.stderr)
-    print("🚀 APPLICATION STARTUP - ENVIRONMENT CHECK", file=sys.stderr)
-    print("🚀 " + "=" * 78, file=sys.stderr)
-    print(f"🚀 AUTH0_DOMAIN: {os.getenv('AUTH0_DOMAIN', 'NOT SET')}", file=sys.stderr)
-    print(f"🚀 AUTH0_AUDIENCE: {os.getenv('AUTH0_AUDIENCE', 'NOT SET')}", file=sys.stderr)
-    print("🚀 " + "=" * 78 + "\n", file=sys.stderr)
+    # Fail at startup rather than rejecting every request later
+    if not AUTH0_DOMAIN or AUTH0_DOMAIN == 'YOUR_AUTH0_DOMAIN':
+        raise RuntimeError("AUTH0_DOMAIN is not set")
+    if not AUTH0_AUDIENCE or AUTH0_AUDIENCE == 'YOUR_API_IDENTIFIER':
+        raise RuntimeError("AUTH0_AUDIENCE is not set")
+    
+    logger.info("🚀 Auth0 domain: %s, audience: %s", AUTH0_DOMAIN, AUTH0_AUDIENCE)
     
     # CRITICAL: CORS must allow Authorization header for authenticated requests
     CORS(app, 
@@ -232,19 +389,19 @@ def create_app():
     @app.before_request
     def handle_preflight():
         if request.method == 'OPTIONS':
-            response = app.make_default_options_response()
-            response.headers['Access-Control-Allow-Origin'] = '*'
-            response.headers['Access-Control-Allow-Headers'] = 'Content-Type, Authorization, X-User-Id'
-            response.headers['Access-Control-Allow-Methods'] = 'GET, POST, PUT, DELETE, OPTIONS'
-            response.headers['Access-Control-Max-Age'] = '3600'
-            return response
+            return app.response_class(status=204, headers=PREFLIGHT_HEADERS)
+    
+    @app.before_request
+    def auth_gate():
+        """Single auth check for all protected blueprints"""
+        if request.method == 'OPTIONS' or request.endpoint not in protected_endpoints:
+            return None
+        return _authenticate()
     
     @app.after_request
     def after_request(response):
         """Add CORS headers to all responses"""
-        response.headers['Access-Control-Allow-Origin'] = '*'
-        response.headers['Access-Control-Allow-Headers'] = 'Content-Type, Authorization, X-User-Id'
-        response.headers['Access-Control-Allow-Methods'] = 'GET, POST, PUT, DELETE, OPTIONS'
+        response.headers.update(CORS_HEADERS)
         return response
     
     # Initialize database
@@ -263,89 +420,82 @@ def create_app():
     
     if user_bp:
         app.register_blueprint(user_bp)
-        for endpoint in ['user.get_user_stats', 'user.get_user_profile']:
-            if endpoint in app.view_functions:
-                app.view_functions[endpoint] = requires_auth(app.view_functions[endpoint])
-        print("✓ Registered user_bp", file=sys.stderr)
+        print("✓ Registered user_bp (with auth)", file=sys.stderr)
     
     if report_bp:
         app.register_blueprint(report_bp)
-        # Apply auth to all report routes
-        for endpoint in ['reports.get_report_history', 'reports.get_report', 
-                        'reports.delete_report_endpoint', 'reports.get_stats']:
-            if endpoint in app.view_functions:
-                app.view_functions[endpoint] = requires_auth(app.view_functions[endpoint])
         print("✓ Registered report_bp (with auth)", file=sys.stderr)
     
-    # **PROTECT ANALYSIS ROUTES**
     if analysis_bp:
         app.register_blueprint(analysis_bp)
-        # Apply auth to analysis endpoint
-        if 'analysis.analyze_dataset' in app.view_functions:
-            app.view_functions['analysis.analyze_dataset'] = requires_auth(app.view_functions['analysis.analyze_dataset'])
-            print("✓ Registered analysis_bp (with auth on /analyze)", file=sys.stderr)
-        else:
-            print("✓ Registered analysis_bp", file=sys.stderr)
+        print("✓ Registered analysis_bp (with auth)", file=sys.stderr)
     
-    # **PROTECT PREPARATION ROUTES** (if they exist)
     if preparation_bp:
         app.register_blueprint(preparation_bp)
-        # Apply auth to preparation endpoints if needed
-        for endpoint in app.view_functions:
-            if endpoint.startswith('preparation.'):
-                app.view_functions[endpoint] = requires_auth(app.view_functions[endpoint])
         print("✓ Registered preparation_bp (with auth)", file=sys.stderr)
     
-    # **PROTECT WORKFLOW ROUTES** (if they exist)
     if workflow_bp:
         app.register_blueprint(workflow_bp)
-        # Apply auth to workflow endpoints if needed
-        for endpoint in app.view_functions:
-            if endpoint.startswith('workflow.'):
-                app.view_functions[endpoint] = requires_auth(app.view_functions[endpoint])
         print("✓ Registered workflow_bp (with auth)", file=sys.stderr)
     
+    # Resolved once here so the auth gate is a single set lookup per request
+    protected_endpoints = frozenset(
+        endpoint for endpoint in app.view_functions
+        if endpoint.startswith(PROTECTED_ENDPOINT_PREFIXES)
+    )
+    
     print("\n" + "=" * 60, file=sys.stderr)
     print("REGISTERED ROUTES:", file=sys.stderr)
     print("=" * 60, file=sys.stderr)
     for rule in app.url_map.iter_rules():
-        endpoint_name = rule.endpoint
-        is_protected = endpoint_name in app.view_functions and hasattr(app.view_functions[endpoint_name], '__wrapped__')
-        protection = "🔒 PROTECTED" if is_protected else "🌐 PUBLIC"
+        protection = "🔒 PROTECTED" if rule.endpoint in protected_endpoints else "🌐 PUBLIC"
         print(f"{protection} | {rule.methods} {rule.rule}", file=sys.stderr)
     print("=" * 60 + "\n", file=sys.stderr)
     
+    @app.errorhandler(RequestEntityTooLarge)
+    def handle_too_large(e):
+        response = jsonify({
+            "error": f"File too large (max {Config.MAX_FILE_SIZE // (1024 * 1024)}MB)"
+        })
+        response.status_code = 413
+        response.headers.update(CORS_HEADERS)
+        return response
+    
     @app.errorhandler(Exception)
     def handle_error(e):
-        print(f"❌ Error occurred: {e}", file=sys.stderr)
-        import traceback
-        traceback.print_exc()
+        now = time.monotonic()
+        recent = sum(1 for t in _ERROR_TIMES if now - t < ERROR_TRACEBACK_WINDOW_SECONDS)
+        _ERROR_TIMES.append(now)
+        
+        # Full tracebacks only for the first few errors per window, so a crash loop stays cheap
+        if recent < ERROR_TRACEBACKS_PER_WINDOW:
+            logger.exception("❌ Error occurred: %s", e)
+        else:
+            logger.error("❌ Error occurred: %s", e)
         response = jsonify({
             "error": str(e),
             "message": "An error occurred"
         })
         response.status_code = 500
-        response.headers['Access-Control-Allow-Origin'] = '*'
-        response.headers['Access-Control-Allow-Headers'] = 'Content-Type,Authorization'
-        response.headers['Access-Control-Allow-Methods'] = 'GET,POST,PUT,DELETE,OPTIONS'
+        response.headers.update(CORS_HEADERS)
         return response
     
     return app
 
 
-app = create_app()
-
-sessions = {}
-try:
-    from routes.preparation_routes import get_sessions as prep_sessions
-    from routes.workflow_routes import get_sessions as workflow_sessions
-    import routes.preparation_routes as prep_module
-    import routes.workflow_routes as workflow_module
-    prep_module.sessions = sessions
-    workflow_module.sessions = sessions
-except ImportError:
-    pass
+def __getattr__(name):
+    """
+    Build the module-level `app` on first access, so `gunicorn app:app` keeps
+    working while process-pool workers, which re-import this file as
+    __mp_main__, never build a second app.
+    """
+    global app
+    if name == 'app':
+        app = create_app()
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 if __name__ == '__main__':
+    app = create_app()
     app.run(debug=True, host='0.0.0.0', port=8000)
\ No newline at end of file
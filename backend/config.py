@@ -1,4 +1,5 @@
 import os
+import tempfile
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -11,17 +12,31 @@ class Config:
     MODEL_NAME = "gpt-4.1-mini"   # CHEAP + RELIABLE
     MAX_TOKENS = 1024             # you don't need 4096 for JSON
 
+    # Auth0 Settings
+    AUTH0_DOMAIN = os.getenv("AUTH0_DOMAIN")
+    AUTH0_AUDIENCE = os.getenv("AUTH0_AUDIENCE")
+
     # File Upload Settings
     UPLOAD_FOLDER = "uploads"
     ALLOWED_EXTENSIONS = {"csv"}
-    MAX_FILE_SIZE = 50 * 1024 * 1024  # 50MB
+    MAX_FILE_SIZE = int(os.getenv("MAX_UPLOAD_BYTES", 50 * 1024 * 1024))  # 50MB
 
     # Processing Settings
     MAX_ROWS = 1_000_000
     SAMPLE_SIZE = 10_000
+    PROFILE_SAMPLE_ROWS = 200_000  # prep profile stats above this are sampled
+
+    # Session Settings
+    SESSION_MAX_ENTRIES = int(os.getenv("SESSION_MAX", 1024))
+    SESSION_TTL_SECONDS = int(os.getenv("SESSION_TTL", 3600))
+    SESSION_DIR = os.getenv("SESSION_DIR", os.path.join(tempfile.gettempdir(), "datavitals_sessions"))
+
+    # Plan Cache Settings
+    PLAN_CACHE_DIR = os.getenv("PLAN_CACHE_DIR", os.path.join(tempfile.gettempdir(), "datavitals_plans"))
+    PLAN_CACHE_TTL_SECONDS = int(os.getenv("PLAN_CACHE_TTL", 24 * 3600))
 
     # Logging
-    LOG_LEVEL = "INFO"
+    LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
 
     @staticmethod
     def allowed_file(filename):
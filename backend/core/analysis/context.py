@@ -0,0 +1,127 @@
+from dataclasses import dataclass
+from typing import List, Optional
+
+import pandas as pd
+import numpy as np
+
+
+def bucket_columns(dtypes):
+    """
+    Split columns into numeric, categorical and datetime in one walk of the
+    dtypes; same buckets as select_dtypes(np.number / object+category / datetime64).
+    """
+    numeric_cols, categorical_cols, datetime_cols = [], [], []
+
+    for col, dtype in dtypes.items():
+        kind = dtype.kind
+        if kind in 'iufcm':
+            numeric_cols.append(col)
+        elif isinstance(dtype, pd.CategoricalDtype) or (isinstance(dtype, np.dtype) and kind == 'O'):
+            categorical_cols.append(col)
+        elif isinstance(dtype, np.dtype) and kind == 'M':
+            datetime_cols.append(col)
+
+    return numeric_cols, categorical_cols, datetime_cols
+
+
+def correlation_matrix(numeric_df: pd.DataFrame) -> np.ndarray:
+    """
+    Pearson correlations as one matrix product over the centered columns.
+    Frames with missing values go through DataFrame.corr(), which skips NaNs pairwise.
+    """
+    values = numeric_df.to_numpy(dtype=np.float64)
+    if np.isnan(values).any():
+        return numeric_df.corr().to_numpy()
+
+    values -= values.mean(axis=0)
+    norms = np.sqrt(np.einsum('ij,ij->j', values, values))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        corr = (values.T @ values) / np.outer(norms, norms)
+
+    # Match pandas: constant columns are NaN, everything else within [-1, 1] with a unit diagonal
+    constant = norms == 0
+    corr[constant, :] = np.nan
+    corr[:, constant] = np.nan
+    np.clip(corr, -1.0, 1.0, out=corr)
+    np.fill_diagonal(corr, np.where(constant, np.nan, 1.0))
+    return corr
+
+
+def unsorted_value_counts(series: pd.Series):
+    """
+    Distinct non-null values and their counts, in no particular order.
+    Object columns are counted on integer codes instead of through an
+    object-indexed Series.
+    """
+    if not pd.api.types.is_object_dtype(series):
+        value_counts = series.value_counts(sort=False)
+        return value_counts.index, value_counts.to_numpy()
+
+    codes, uniques = pd.factorize(series)
+    return uniques, np.bincount(codes[codes >= 0], minlength=len(uniques))
+
+
+def sorted_value_counts(series: pd.Series):
+    """
+    Distinct non-null values and their counts, in Series.value_counts() order.
+    Object columns are counted on integer codes, which skips building and
+    sorting an object-indexed Series for high-cardinality columns.
+    """
+    if not pd.api.types.is_object_dtype(series):
+        value_counts = series.value_counts()
+        return value_counts.index, value_counts.to_numpy()
+
+    uniques, counts = unsorted_value_counts(series)
+
+    # Same descending sort value_counts() runs, so ties come out in the same order
+    positions = np.arange(len(counts))[::-1]
+    order = positions[counts[::-1].argsort(kind='quicksort')][::-1]
+    return uniques[order], counts[order]
+
+
+def top_k_positions(counts: np.ndarray, k: int) -> np.ndarray:
+    """
+    Positions of the k largest counts, largest first, ties in position order.
+    Selects with a partition instead of sorting every count.
+    """
+    if len(counts) > k:
+        kth = np.partition(counts, len(counts) - k)[len(counts) - k]
+        candidates = np.flatnonzero(counts >= kth)
+    else:
+        candidates = np.arange(len(counts))
+    return candidates[np.argsort(-counts[candidates], kind='stable')][:k]
+
+
+@dataclass
+class AnalysisContext:
+    """
+    Column facts shared by the analyzers.
+    Built once per dataset so each analyzer doesn't rescan the frame.
+    """
+
+    numeric_cols: List[str]
+    categorical_cols: List[str]
+    datetime_cols: List[str]
+    null_counts: pd.Series
+    row_null_counts: pd.Series
+    nunique: pd.Series
+    target: Optional[str] = None
+    # Row sample for ratio-style statistics; None when the full frame is small enough
+    sample: Optional[pd.DataFrame] = None
+
+    @classmethod
+    def build(cls, df, target_col=None, sample_size=None):
+        """Single pass over the frame for null masks, cardinality and dtype buckets."""
+        nulls = df.isnull()
+        numeric_cols, categorical_cols, datetime_cols = bucket_columns(df.dtypes)
+
+        return cls(
+            numeric_cols=numeric_cols,
+            categorical_cols=categorical_cols,
+            datetime_cols=datetime_cols,
+            null_counts=nulls.sum(),
+            row_null_counts=nulls.sum(axis=1),
+            nunique=df.nunique(),
+            target=target_col,
+            sample=df.sample(n=sample_size, random_state=42) if sample_size and len(df) > sample_size else None
+        )
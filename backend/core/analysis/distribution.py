@@ -1,6 +1,41 @@
 import pandas as pd
 import numpy as np
-from scipy import stats
+
+from core.analysis.context import top_k_positions, unsorted_value_counts
+
+
+def _skew_kurtosis(values):
+    """
+    Biased skewness and Fisher kurtosis, computed the way scipy.stats.skew and
+    scipy.stats.kurtosis do but from one shared set of central moments.
+    """
+    dtype = values.dtype.type if values.dtype.kind in 'fc' else np.float64
+    mean = np.asarray(values.mean(), dtype=dtype)
+    centered = values - mean
+    squared = centered ** 2
+    m2 = np.mean(squared)
+    m3 = np.mean(squared * centered)
+    m4 = np.mean(squared ** 2)
+
+    with np.errstate(all='ignore'):
+        # Near-constant columns have no meaningful shape
+        if m2 <= (np.finfo(m2.dtype).resolution * mean) ** 2:
+            return float('nan'), float('nan')
+        return float(m3 / m2 ** 1.5), float(m4 / m2 ** 2.0 - 3)
+
+
+def _sample_std(values):
+    """
+    Sample standard deviation worked out the way Series.std does: a two-pass
+    variance accumulated in float64, kept in the column's precision for floats.
+    """
+    if values.dtype.kind != 'f':
+        values = values.astype(np.float64)
+    n = len(values)
+    avg = values.sum(dtype=np.float64) / n
+    variance = ((avg - values) ** 2).sum(dtype=np.float64) / (n - 1)
+    return float(np.sqrt(variance.astype(values.dtype)))
+
 
 class DistributionAnalyzer:
     """
@@ -8,9 +43,10 @@ class DistributionAnalyzer:
     Silent model killers detection.
     """
     
-    def __init__(self, df, target_col=None):
+    def __init__(self, df, target_col=None, ctx=None):
         self.df = df
         self.target_col = target_col
+        self.ctx = ctx
         
     def analyze(self):
         """Returns distribution analysis for numeric and categorical features."""
@@ -19,7 +55,10 @@ class DistributionAnalyzer:
         categorical_analysis = []
         
         # Numeric features
-        numeric_cols = self.df.select_dtypes(include=[np.number]).columns
+        if self.ctx is not None:
+            numeric_cols = self.ctx.numeric_cols
+        else:
+            numeric_cols = self.df.select_dtypes(include=[np.number]).columns
         for col in numeric_cols:
             if col == self.target_col:
                 continue
@@ -29,7 +68,10 @@ class DistributionAnalyzer:
                 numeric_analysis.append(analysis)
         
         # Categorical features
-        categorical_cols = self.df.select_dtypes(include=['object', 'category']).columns
+        if self.ctx is not None:
+            categorical_cols = self.ctx.categorical_cols
+        else:
+            categorical_cols = self.df.select_dtypes(include=['object', 'category']).columns
         for col in categorical_cols:
             if col == self.target_col:
                 continue
@@ -64,15 +106,22 @@ class DistributionAnalyzer:
         if len(series) < 2:
             return None
         
-        # Basic stats
-        mean_val = float(series.mean())
-        median_val = float(series.median())
-        std_val = float(series.std())
-        min_val = float(series.min())
-        max_val = float(series.max())
+        values = series.to_numpy()
+        
+        # Basic stats on the bare array; extremes, quartiles and median share one percentile call
+        mean_val = float(values.mean())
+        min_val, q1, median_val, q3, max_val = np.percentile(
+            values.astype(np.float64, copy=False), [0, 25, 50, 75, 100]
+        )
+        if values.dtype.kind == 'f' and values.dtype != np.float64:
+            # Narrow floats are averaged in their own precision, as Series.median does
+            median_val = np.median(values)
+        min_val, median_val, max_val = float(min_val), float(median_val), float(max_val)
         
-        # Skewness (asymmetry)
-        skewness = float(stats.skew(series))
+        std_val = _sample_std(values)
+        
+        # Skewness (asymmetry) and kurtosis (tail heaviness)
+        skewness, kurtosis = _skew_kurtosis(values)
         if abs(skewness) < 0.5:
             skew_flag = 'low'
         elif abs(skewness) < 1:
@@ -80,8 +129,6 @@ class DistributionAnalyzer:
         else:
             skew_flag = 'high'
         
-        # Kurtosis (tail heaviness)
-        kurtosis = float(stats.kurtosis(series))
         if abs(kurtosis) < 1:
             kurt_flag = 'normal'
         elif abs(kurtosis) < 3:
@@ -90,15 +137,12 @@ class DistributionAnalyzer:
             kurt_flag = 'extreme'
         
         # IQR outlier detection
-        q1 = series.quantile(0.25)
-        q3 = series.quantile(0.75)
         iqr = q3 - q1
         
         lower_bound = q1 - 1.5 * iqr
         upper_bound = q3 + 1.5 * iqr
         
-        outliers = series[(series < lower_bound) | (series > upper_bound)]
-        outlier_count = len(outliers)
+        outlier_count = int(np.count_nonzero((values < lower_bound) | (values > upper_bound)))
         outlier_pct = (outlier_count / len(series) * 100) if len(series) > 0 else 0
         
         return {
@@ -130,29 +174,31 @@ class DistributionAnalyzer:
         if len(series) == 0:
             return None
         
-        value_counts = series.value_counts()
-        n_unique = len(value_counts)
+        values, counts = unsorted_value_counts(series)
+        n_unique = len(counts)
+        
+        # Only the top five need ordering, so select them rather than sort every count
+        top = top_k_positions(counts, 5)
         
         # Dominant category
-        top_value = value_counts.index[0]
-        top_count = int(value_counts.iloc[0])
+        top_value = values[top[0]]
+        top_count = int(counts[top[0]])
         top_percentage = (top_count / len(series) * 100)
         
         # Distribution entropy (measure of uniformity)
-        proportions = value_counts / len(series)
+        proportions = counts / len(series)
         entropy = float(-np.sum(proportions * np.log2(proportions + 1e-10)))
         max_entropy = np.log2(n_unique) if n_unique > 1 else 1
         normalized_entropy = entropy / max_entropy if max_entropy > 0 else 0
         
-        # Top categories
-        top_n = min(5, n_unique)
-        top_categories = []
-        for i in range(top_n):
-            top_categories.append({
-                'value': str(value_counts.index[i]),
-                'count': int(value_counts.iloc[i]),
-                'percentage': round(float(value_counts.iloc[i] / len(series) * 100), 2)
-            })
+        # Top categories, built from the selected slices in one pass
+        top_counts = counts[top]
+        top_categories = [
+            {'value': str(value), 'count': count, 'percentage': round(percentage, 2)}
+            for value, count, percentage in zip(
+                values[top], top_counts.tolist(), (top_counts / len(series) * 100).tolist()
+            )
+        ]
         
         return {
             'column': col,
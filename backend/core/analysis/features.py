@@ -1,15 +1,18 @@
 import pandas as pd
 import numpy as np
 
+from core.analysis.context import correlation_matrix
+
 class FeatureQuality:
     """
     Feature quality checks: Cut garbage early.
     Pure stats. No ML.
     """
     
-    def __init__(self, df, target_col=None):
+    def __init__(self, df, target_col=None, ctx=None):
         self.df = df
         self.target_col = target_col
+        self.ctx = ctx
         
     def analyze(self):
         """Returns feature quality assessment."""
@@ -19,14 +22,18 @@ class FeatureQuality:
         high_cardinality_features = []
         redundant_features = []
         
+        # Column facts read once up front instead of per column
+        nuniques = (self.ctx.nunique if self.ctx is not None else self.df.nunique()).to_dict()
+        dtypes = self.df.dtypes.to_dict()
+        n_rows = len(self.df)
+        
         # Check each column
         for col in self.df.columns:
             if col == self.target_col:
                 continue
                 
             # Constant / near-constant check
-            nunique = self.df[col].nunique()
-            n_rows = len(self.df)
+            nunique = int(nuniques[col])
             
             if nunique == 1:
                 constant_features.append({
@@ -35,9 +42,9 @@ class FeatureQuality:
                 })
             elif nunique <= 2 and n_rows > 100:
                 # Near-constant: very low variance
-                value_counts = self.df[col].value_counts()
+                value_counts = self.df[col].value_counts(sort=False)
                 if len(value_counts) > 0:
-                    dominant_pct = (value_counts.iloc[0] / n_rows * 100)
+                    dominant_pct = (value_counts.max() / n_rows * 100)
                     if dominant_pct > 95:
                         near_constant_features.append({
                             'column': col,
@@ -46,7 +53,8 @@ class FeatureQuality:
                         })
             
             # High cardinality check (for categorical)
-            if self.df[col].dtype == 'object' or self.df[col].dtype.name == 'category':
+            dtype = dtypes[col]
+            if dtype == 'object' or dtype.name == 'category':
                 cardinality_ratio = nunique / n_rows
                 if cardinality_ratio > 0.5 and nunique > 50:
                     high_cardinality_features.append({
@@ -55,28 +63,28 @@ class FeatureQuality:
                         'cardinality_ratio': round(cardinality_ratio, 2)
                     })
         
-        # Redundant features (high correlation for numeric)
-        numeric_df = self.df.select_dtypes(include=[np.number])
+        # Redundant features (high correlation for numeric); a row sample is plenty
+        if self.ctx is not None:
+            source = self.ctx.sample if self.ctx.sample is not None else self.df
+            numeric_df = source[self.ctx.numeric_cols]
+        else:
+            numeric_df = self.df.select_dtypes(include=[np.number])
         if self.target_col in numeric_df.columns:
             numeric_df = numeric_df.drop(columns=[self.target_col])
         
         if len(numeric_df.columns) > 1:
-            corr_matrix = numeric_df.corr().abs()
-            
-            # Get upper triangle
-            upper = corr_matrix.where(
-                np.triu(np.ones(corr_matrix.shape), k=1).astype(bool)
-            )
+            corr = np.abs(correlation_matrix(numeric_df))
             
-            # Find highly correlated pairs
-            for col in upper.columns:
-                high_corr = upper[col][upper[col] > 0.95].index.tolist()
-                for corr_col in high_corr:
-                    redundant_features.append({
-                        'column_1': col,
-                        'column_2': corr_col,
-                        'correlation': round(float(upper.loc[corr_col, col]), 3)
-                    })
+            # Upper triangle only, walked column by column
+            with np.errstate(invalid='ignore'):
+                high = np.triu(corr > 0.95, k=1)
+            cols = numeric_df.columns.tolist()
+            for j, i in zip(*np.nonzero(high.T)):
+                redundant_features.append({
+                    'column_1': cols[j],
+                    'column_2': cols[i],
+                    'correlation': round(float(corr[i, j]), 3)
+                })
         
         # Summary
         total_features = len(self.df.columns) - (1 if self.target_col else 0)
@@ -1,15 +1,18 @@
 import pandas as pd
 import numpy as np
 
+from core.analysis.context import sorted_value_counts
+
 class ImbalanceAnalyzer:
     """
     Class imbalance detection.
     Only when target exists. Pure detection, no suggestions.
     """
     
-    def __init__(self, df, target_col):
+    def __init__(self, df, target_col, ctx=None):
         self.df = df
         self.target_col = target_col
+        self.ctx = ctx
         
     def analyze(self):
         """Returns class imbalance analysis for target column."""
@@ -30,7 +33,10 @@ class ImbalanceAnalyzer:
             }
         
         # Determine if classification or regression
-        n_unique = target_series.nunique()
+        if self.ctx is not None:
+            n_unique = int(self.ctx.nunique[self.target_col])
+        else:
+            n_unique = target_series.nunique()
         is_classification = n_unique <= 20  # Heuristic
         
         if not is_classification:
@@ -43,22 +49,20 @@ class ImbalanceAnalyzer:
     def _analyze_classification_target(self, target_series):
         """Analyze classification target imbalance."""
         
-        value_counts = target_series.value_counts()
-        n_classes = len(value_counts)
+        values, counts = sorted_value_counts(target_series)
+        n_classes = len(counts)
         
         # Class distribution
-        class_distribution = []
-        for cls, count in value_counts.items():
-            percentage = (count / len(target_series) * 100)
-            class_distribution.append({
-                'class': str(cls),
-                'count': int(count),
-                'percentage': round(percentage, 2)
-            })
+        class_distribution = [
+            {'class': str(cls), 'count': count, 'percentage': round(percentage, 2)}
+            for cls, count, percentage in zip(
+                values, counts.tolist(), (counts / len(target_series) * 100).tolist()
+            )
+        ]
         
         # Imbalance metrics
-        majority_class_count = int(value_counts.iloc[0])
-        minority_class_count = int(value_counts.iloc[-1])
+        majority_class_count = int(counts[0])
+        minority_class_count = int(counts[-1])
         majority_pct = (majority_class_count / len(target_series) * 100)
         minority_pct = (minority_class_count / len(target_series) * 100)
         
@@ -85,10 +89,10 @@ class ImbalanceAnalyzer:
             'n_classes': int(n_classes),
             'class_distribution': class_distribution,
             'imbalance': {
-                'majority_class': str(value_counts.index[0]),
+                'majority_class': str(values[0]),
                 'majority_count': majority_class_count,
                 'majority_percentage': round(majority_pct, 2),
-                'minority_class': str(value_counts.index[-1]),
+                'minority_class': str(values[-1]),
                 'minority_count': minority_class_count,
                 'minority_percentage': round(minority_pct, 2),
                 'ratio': round(imbalance_ratio, 2),
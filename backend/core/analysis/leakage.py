@@ -223,22 +223,33 @@ class LeakageDetector:
             }
         }
     
+    def _single_feature_matrices(self, train_col, test_col):
+        """
+        One-column float32 train/test matrices for a single-feature model.
+        Missing values are filled per split; categoricals are label encoded on train.
+        """
+        if pd.api.types.is_numeric_dtype(train_col):
+            train_values = train_col.fillna(train_col.mean())
+            test_values = test_col.fillna(test_col.mean())
+        else:
+            train_values = train_col.fillna(train_col.mode().iloc[0])
+            test_values = test_col.fillna(test_col.mode().iloc[0])
+        
+        # Encode categorical
+        if train_values.dtype == 'object':
+            le = LabelEncoder()
+            train_values = le.fit_transform(train_values.astype(str))
+            test_values = le.transform(test_values.astype(str))
+        
+        return (
+            np.asarray(train_values, dtype=np.float32).reshape(-1, 1),
+            np.asarray(test_values, dtype=np.float32).reshape(-1, 1)
+        )
+    
     def _single_feature_auc(self, col, X_train, X_test, y_train, y_test):
         """Train a simple model using only one feature and return AUC."""
         try:
-            # Get single feature
-            X_train_single = X_train[[col]].copy()
-            X_test_single = X_test[[col]].copy()
-            
-            # Handle missing values
-            X_train_single = X_train_single.fillna(X_train_single.mean() if pd.api.types.is_numeric_dtype(X_train_single[col]) else X_train_single.mode().iloc[0])
-            X_test_single = X_test_single.fillna(X_test_single.mean() if pd.api.types.is_numeric_dtype(X_test_single[col]) else X_test_single.mode().iloc[0])
-            
-            # Encode categorical
-            if X_train_single[col].dtype == 'object':
-                le = LabelEncoder()
-                X_train_single[col] = le.fit_transform(X_train_single[col].astype(str))
-                X_test_single[col] = le.transform(X_test_single[col].astype(str))
+            X_train_single, X_test_single = self._single_feature_matrices(X_train[col], X_test[col])
             
             # Train simple model
             model = RandomForestClassifier(n_estimators=50, max_depth=5, random_state=42, n_jobs=-1)
@@ -260,19 +271,7 @@ class LeakageDetector:
     def _single_feature_r2(self, col, X_train, X_test, y_train, y_test):
         """Train a simple model using only one feature and return R²."""
         try:
-            # Get single feature
-            X_train_single = X_train[[col]].copy()
-            X_test_single = X_test[[col]].copy()
-            
-            # Handle missing values
-            X_train_single = X_train_single.fillna(X_train_single.mean() if pd.api.types.is_numeric_dtype(X_train_single[col]) else X_train_single.mode().iloc[0])
-            X_test_single = X_test_single.fillna(X_test_single.mean() if pd.api.types.is_numeric_dtype(X_test_single[col]) else X_test_single.mode().iloc[0])
-            
-            # Encode categorical
-            if X_train_single[col].dtype == 'object':
-                le = LabelEncoder()
-                X_train_single[col] = le.fit_transform(X_train_single[col].astype(str))
-                X_test_single[col] = le.transform(X_test_single[col].astype(str))
+            X_train_single, X_test_single = self._single_feature_matrices(X_train[col], X_test[col])
             
             # Train simple model
             model = RandomForestRegressor(n_estimators=50, max_depth=5, random_state=42, n_jobs=-1)
@@ -7,15 +7,16 @@ class MissingAnalyzer:
     Not just counts - severity flags.
     """
     
-    def __init__(self, df, target_col=None):
+    def __init__(self, df, target_col=None, ctx=None):
         self.df = df
         self.target_col = target_col
+        self.ctx = ctx
         
     def analyze(self):
         """Returns missing value analysis with severity flags."""
         
         # Column-wise missing
-        col_missing = self.df.isnull().sum()
+        col_missing = self.ctx.null_counts if self.ctx is not None else self.df.isnull().sum()
         col_missing_pct = (col_missing / len(self.df) * 100).round(2)
         
         column_analysis = []
@@ -39,7 +40,8 @@ class MissingAnalyzer:
             })
         
         # Row-wise extreme missingness
-        row_missing_pct = (self.df.isnull().sum(axis=1) / len(self.df.columns) * 100)
+        row_missing = self.ctx.row_null_counts if self.ctx is not None else self.df.isnull().sum(axis=1)
+        row_missing_pct = (row_missing / len(self.df.columns) * 100)
         extreme_missing_rows = (row_missing_pct > 50).sum()
         extreme_missing_pct = (extreme_missing_rows / len(self.df) * 100) if len(self.df) > 0 else 0
         
@@ -47,7 +49,7 @@ class MissingAnalyzer:
         target_missing = None
         if self.target_col:
             if self.target_col in self.df.columns:
-                target_missing_count = int(self.df[self.target_col].isnull().sum())
+                target_missing_count = int(col_missing[self.target_col])
                 target_missing_pct = float((target_missing_count / len(self.df) * 100))
                 target_missing = {
                     'exists': True,
@@ -1,14 +1,38 @@
 import pandas as pd
 import numpy as np
 
+from config import Config
+from core.analysis.context import bucket_columns
+
+def estimate_memory_bytes(df):
+    """
+    Frame memory footprint. Object columns are sized on a row sample
+    and scaled up, instead of measuring every string.
+    """
+    n_rows = len(df)
+    object_cols = [col for col, dtype in df.dtypes.items() if dtype == object]
+    
+    if not object_cols or n_rows <= Config.SAMPLE_SIZE:
+        return df.memory_usage(deep=True).sum()
+    
+    shallow = df.memory_usage(deep=False).sum()
+    sample = df[object_cols].sample(n=Config.SAMPLE_SIZE, random_state=42)
+    sample_payload = (
+        sample.memory_usage(deep=True, index=False).sum()
+        - sample.memory_usage(deep=False, index=False).sum()
+    )
+    return shallow + int(sample_payload * n_rows / Config.SAMPLE_SIZE)
+
+
 class DatasetProfiler:
     """
     Foundation layer: Basic dataset statistics.
     No interpretation. Just facts.
     """
     
-    def __init__(self, df):
+    def __init__(self, df, ctx=None):
         self.df = df
+        self.ctx = ctx
         
     def profile(self):
         """Returns core dataset metrics."""
@@ -17,26 +41,31 @@ class DatasetProfiler:
         n_rows, n_cols = self.df.shape
         
         # Data types
-        dtypes_count = self.df.dtypes.value_counts().to_dict()
-        dtypes_map = {col: str(dtype) for col, dtype in self.df.dtypes.items()}
+        dtypes = self.df.dtypes
+        dtypes_count = dtypes.value_counts().to_dict()
+        dtypes_map = {col: str(dtype) for col, dtype in dtypes.items()}
         
         # Missing values
         total_cells = n_rows * n_cols
-        missing_cells = self.df.isnull().sum().sum()
+        null_counts = self.ctx.null_counts if self.ctx is not None else self.df.isnull().sum()
+        missing_cells = null_counts.sum()
         missing_pct = (missing_cells / total_cells * 100) if total_cells > 0 else 0
         
         # Duplicates
-        n_duplicates = self.df.duplicated().sum()
+        n_duplicates = self._count_duplicates()
         duplicate_pct = (n_duplicates / n_rows * 100) if n_rows > 0 else 0
         
         # Memory
-        memory_bytes = self.df.memory_usage(deep=True).sum()
+        memory_bytes = estimate_memory_bytes(self.df)
         memory_mb = memory_bytes / (1024 ** 2)
         
         # Column types breakdown
-        numeric_cols = self.df.select_dtypes(include=[np.number]).columns.tolist()
-        categorical_cols = self.df.select_dtypes(include=['object', 'category']).columns.tolist()
-        datetime_cols = self.df.select_dtypes(include=['datetime64']).columns.tolist()
+        if self.ctx is not None:
+            numeric_cols = list(self.ctx.numeric_cols)
+            categorical_cols = list(self.ctx.categorical_cols)
+            datetime_cols = list(self.ctx.datetime_cols)
+        else:
+            numeric_cols, categorical_cols, datetime_cols = bucket_columns(dtypes)
         
         return {
             'shape': {
@@ -65,4 +94,12 @@ class DatasetProfiler:
                 'categorical': categorical_cols,
                 'datetime': datetime_cols
             }
-        }
\ No newline at end of file
+        }
+    
+    def _count_duplicates(self):
+        """Duplicate rows, counted on one 64-bit hash per row."""
+        if len(self.df) <= Config.SAMPLE_SIZE:
+            return self.df.duplicated().sum()
+        
+        row_hashes = pd.util.hash_pandas_object(self.df, index=False).to_numpy()
+        return len(row_hashes) - len(np.unique(row_hashes))
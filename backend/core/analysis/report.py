@@ -1,3 +1,55 @@
+import bisect
+import heapq
+from types import MappingProxyType
+from typing import NamedTuple
+
+# Read-only default for missing report sections
+_EMPTY = MappingProxyType({})
+
+# Tie-break between risks of equal priority
+_SEVERITY_ORDER = {'critical': 0, 'high': 1, 'medium': 2, 'low': 3}
+
+# Lower bounds of the FAIR, GOOD and EXCELLENT verdicts
+_VERDICT_CUTS = (50, 70, 85)
+_VERDICTS = (
+    MappingProxyType({
+        'status': 'POOR',
+        'safe_to_train': False,
+        'message': 'Dataset is NOT safe for training. Critical issues detected.',
+        'color': 'red'
+    }),
+    MappingProxyType({
+        'status': 'FAIR',
+        'safe_to_train': False,
+        'message': 'Dataset has significant issues. Address critical problems before training.',
+        'color': 'orange'
+    }),
+    MappingProxyType({
+        'status': 'GOOD',
+        'safe_to_train': True,
+        'message': 'Dataset is in good health with minor issues. Safe to train after reviewing warnings.',
+        'color': 'blue'
+    }),
+    MappingProxyType({
+        'status': 'EXCELLENT',
+        'safe_to_train': True,
+        'message': 'Dataset is in excellent health. Safe to proceed with model training.',
+        'color': 'green'
+    }),
+)
+
+
+class Risk(NamedTuple):
+    """One ranked risk; turned into a dict only when the report is serialized."""
+    type: str
+    severity: str
+    priority: int
+    title: str
+    description: str
+    impact: str
+    action: str
+
+
 class ReportGenerator:
     """
     Final report generator.
@@ -18,7 +70,7 @@ class ReportGenerator:
         verdict = self._determine_verdict(overall_score)
         
         # Extract top risks
-        risks = self._identify_top_risks()
+        risks = self._identify_top_risks(limit=3)
         
         # Generate recommendations
         recommendations = self._generate_recommendations(risks)
@@ -30,7 +82,7 @@ class ReportGenerator:
             'verdict': verdict,
             'health_score': overall_score,
             'grade': grade,
-            'top_risks': risks[:3],  # Top 3 only
+            'top_risks': [risk._asdict() for risk in risks],  # Top 3 only
             'recommendations': recommendations,
             'summary': summary,
             'component_breakdown': self.health_score.get('component_scores', {})
@@ -38,213 +90,189 @@ class ReportGenerator:
     
     def _determine_verdict(self, score):
         """Determine overall verdict based on score."""
-        if score >= 85:
-            return {
-                'status': 'EXCELLENT',
-                'safe_to_train': True,
-                'message': 'Dataset is in excellent health. Safe to proceed with model training.',
-                'color': 'green'
-            }
-        elif score >= 70:
-            return {
-                'status': 'GOOD',
-                'safe_to_train': True,
-                'message': 'Dataset is in good health with minor issues. Safe to train after reviewing warnings.',
-                'color': 'blue'
-            }
-        elif score >= 50:
-            return {
-                'status': 'FAIR',
-                'safe_to_train': False,
-                'message': 'Dataset has significant issues. Address critical problems before training.',
-                'color': 'orange'
-            }
-        else:
-            return {
-                'status': 'POOR',
-                'safe_to_train': False,
-                'message': 'Dataset is NOT safe for training. Critical issues detected.',
-                'color': 'red'
-            }
+        # Copied so the response and the saved report get a plain dict
+        return dict(_VERDICTS[bisect.bisect_right(_VERDICT_CUTS, score)])
     
-    def _identify_top_risks(self):
-        """Identify and rank all risks across all analyses."""
+    def _identify_top_risks(self, limit=3):
+        """Identify risks across all analyses and return the `limit` highest ranked."""
         risks = []
         
+        # Look up each analysis subtree once
+        report = self.report
+        leakage = report.get('leakage') or _EMPTY
+        missing = report.get('missing') or _EMPTY
+        baseline = report.get('baseline') or _EMPTY
+        overfitting = baseline.get('overfitting') or _EMPTY
+        overfitting_severity = overfitting.get('severity') if baseline.get('exists') else None
+        profile = report.get('profile') or _EMPTY
+        imbalance = report.get('imbalance') or _EMPTY
+        distribution_summary = (report.get('distribution') or _EMPTY).get('summary') or _EMPTY
+        
         # === CRITICAL RISKS (Priority 1) ===
         
         # 1. Data Leakage (HIGHEST PRIORITY)
-        if self.report.get('leakage', {}).get('exists'):
-            leakage = self.report['leakage']
-            critical_leakage = leakage.get('summary', {}).get('critical_leakage', 0)
-            high_risk_leakage = leakage.get('summary', {}).get('high_risk_leakage', 0)
+        if leakage.get('exists'):
+            leakage_summary = leakage.get('summary') or _EMPTY
+            critical_leakage = leakage_summary.get('critical_leakage', 0)
+            high_risk_leakage = leakage_summary.get('high_risk_leakage', 0)
             
             if critical_leakage > 0:
                 leakage_features = leakage.get('leakage_features', [])[:3]
                 feature_names = [f['feature'] for f in leakage_features if f['risk'] == 'critical']
                 
-                risks.append({
-                    'type': 'CRITICAL_LEAKAGE',
-                    'severity': 'critical',
-                    'priority': 1,
-                    'title': 'Critical Data Leakage Detected',
-                    'description': f'{critical_leakage} feature(s) show near-perfect prediction ability: {", ".join(feature_names[:3])}',
-                    'impact': 'Model will appear perfect but fail in production',
-                    'action': 'Remove or investigate these features immediately'
-                })
+                risks.append(Risk(
+                    type='CRITICAL_LEAKAGE',
+                    severity='critical',
+                    priority=1,
+                    title='Critical Data Leakage Detected',
+                    description=f'{critical_leakage} feature(s) show near-perfect prediction ability: {", ".join(feature_names[:3])}',
+                    impact='Model will appear perfect but fail in production',
+                    action='Remove or investigate these features immediately'
+                ))
             elif high_risk_leakage > 0:
-                risks.append({
-                    'type': 'HIGH_RISK_LEAKAGE',
-                    'severity': 'high',
-                    'priority': 2,
-                    'title': 'Suspicious Features Detected',
-                    'description': f'{high_risk_leakage} feature(s) show unusually high predictive power',
-                    'impact': 'Potential leakage or data quality issues',
-                    'action': 'Investigate feature engineering and data collection process'
-                })
+                risks.append(Risk(
+                    type='HIGH_RISK_LEAKAGE',
+                    severity='high',
+                    priority=2,
+                    title='Suspicious Features Detected',
+                    description=f'{high_risk_leakage} feature(s) show unusually high predictive power',
+                    impact='Potential leakage or data quality issues',
+                    action='Investigate feature engineering and data collection process'
+                ))
         
         # 2. Target Missing Values
-        if self.report.get('missing', {}).get('target_analysis', {}).get('critical'):
-            target_analysis = self.report['missing']['target_analysis']
+        target_analysis = missing.get('target_analysis') or _EMPTY
+        if target_analysis.get('critical'):
             missing_pct = target_analysis.get('missing_percentage', 0)
             
-            risks.append({
-                'type': 'TARGET_MISSING',
-                'severity': 'critical',
-                'priority': 1,
-                'title': 'Target Column Has Missing Values',
-                'description': f'{missing_pct}% of target values are missing',
-                'impact': 'Cannot train model with missing targets',
-                'action': 'Remove rows with missing targets or obtain correct labels'
-            })
+            risks.append(Risk(
+                type='TARGET_MISSING',
+                severity='critical',
+                priority=1,
+                title='Target Column Has Missing Values',
+                description=f'{missing_pct}% of target values are missing',
+                impact='Cannot train model with missing targets',
+                action='Remove rows with missing targets or obtain correct labels'
+            ))
         
         # 3. Severe Overfitting
-        if self.report.get('baseline', {}).get('exists'):
-            baseline = self.report['baseline']
-            overfitting = baseline.get('overfitting', {})
+        if overfitting_severity == 'severe':
+            gap = overfitting.get('gap', 0)
             
-            if overfitting.get('severity') == 'severe':
-                gap = overfitting.get('gap', 0)
-                
-                risks.append({
-                    'type': 'SEVERE_OVERFITTING',
-                    'severity': 'critical',
-                    'priority': 1,
-                    'title': 'Severe Overfitting Detected',
-                    'description': f'Train-test performance gap: {gap:.2%}',
-                    'impact': 'Model will not generalize to new data',
-                    'action': 'Increase data size, reduce model complexity, or add regularization'
-                })
+            risks.append(Risk(
+                type='SEVERE_OVERFITTING',
+                severity='critical',
+                priority=1,
+                title='Severe Overfitting Detected',
+                description=f'Train-test performance gap: {gap:.2%}',
+                impact='Model will not generalize to new data',
+                action='Increase data size, reduce model complexity, or add regularization'
+            ))
         
         # === HIGH PRIORITY RISKS (Priority 2) ===
         
         # 4. Constant Features
-        constant_features = self.report.get('features', {}).get('constant_features', [])
+        constant_features = (report.get('features') or _EMPTY).get('constant_features', [])
         if len(constant_features) > 0:
             feature_names = [f['column'] for f in constant_features]
             
-            risks.append({
-                'type': 'CONSTANT_FEATURES',
-                'severity': 'high',
-                'priority': 2,
-                'title': 'Constant Features Detected',
-                'description': f'{len(constant_features)} feature(s) have only one value: {", ".join(feature_names[:3])}',
-                'impact': 'Zero information content, waste of resources',
-                'action': 'Remove these features'
-            })
+            risks.append(Risk(
+                type='CONSTANT_FEATURES',
+                severity='high',
+                priority=2,
+                title='Constant Features Detected',
+                description=f'{len(constant_features)} feature(s) have only one value: {", ".join(feature_names[:3])}',
+                impact='Zero information content, waste of resources',
+                action='Remove these features'
+            ))
         
         # 5. High Missing Data
-        if self.report.get('profile', {}).get('missing', {}).get('missing_percentage', 0) > 20:
-            missing_pct = self.report['profile']['missing']['missing_percentage']
+        missing_pct = (profile.get('missing') or _EMPTY).get('missing_percentage', 0)
+        if missing_pct > 20:
             
-            risks.append({
-                'type': 'HIGH_MISSING',
-                'severity': 'high',
-                'priority': 2,
-                'title': 'High Missing Data Percentage',
-                'description': f'{missing_pct}% of all values are missing',
-                'impact': 'Imputation may introduce bias, reduced effective sample size',
-                'action': 'Investigate data collection process or consider dropping high-missing columns'
-            })
+            risks.append(Risk(
+                type='HIGH_MISSING',
+                severity='high',
+                priority=2,
+                title='High Missing Data Percentage',
+                description=f'{missing_pct}% of all values are missing',
+                impact='Imputation may introduce bias, reduced effective sample size',
+                action='Investigate data collection process or consider dropping high-missing columns'
+            ))
         
         # 6. Severe Class Imbalance
-        if self.report.get('imbalance', {}).get('exists'):
-            imbalance = self.report['imbalance']
+        if imbalance.get('exists'):
             if imbalance.get('task_type') == 'classification':
-                severity = imbalance.get('imbalance', {}).get('severity')
+                class_imbalance = imbalance.get('imbalance') or _EMPTY
+                severity = class_imbalance.get('severity')
                 
                 if severity == 'severe':
-                    ratio = imbalance.get('imbalance', {}).get('ratio', 0)
-                    minority_pct = imbalance.get('imbalance', {}).get('minority_percentage', 0)
+                    ratio = class_imbalance.get('ratio', 0)
+                    minority_pct = class_imbalance.get('minority_percentage', 0)
                     
-                    risks.append({
-                        'type': 'SEVERE_IMBALANCE',
-                        'severity': 'high',
-                        'priority': 2,
-                        'title': 'Severe Class Imbalance',
-                        'description': f'Class ratio: {ratio:.1f}:1, minority class: {minority_pct}%',
-                        'impact': 'Model may ignore minority class, poor recall',
-                        'action': 'Consider resampling, class weights, or collecting more minority samples'
-                    })
+                    risks.append(Risk(
+                        type='SEVERE_IMBALANCE',
+                        severity='high',
+                        priority=2,
+                        title='Severe Class Imbalance',
+                        description=f'Class ratio: {ratio:.1f}:1, minority class: {minority_pct}%',
+                        impact='Model may ignore minority class, poor recall',
+                        action='Consider resampling, class weights, or collecting more minority samples'
+                    ))
         
         # === MEDIUM PRIORITY RISKS (Priority 3) ===
         
         # 7. Small Dataset
-        n_rows = self.report.get('profile', {}).get('shape', {}).get('rows', 0)
+        n_rows = (profile.get('shape') or _EMPTY).get('rows', 0)
         if n_rows < 500:
-            risks.append({
-                'type': 'SMALL_DATASET',
-                'severity': 'medium',
-                'priority': 3,
-                'title': 'Small Dataset Size',
-                'description': f'Only {n_rows} rows available',
-                'impact': 'High variance, poor generalization',
-                'action': 'Collect more data or use simpler models'
-            })
+            risks.append(Risk(
+                type='SMALL_DATASET',
+                severity='medium',
+                priority=3,
+                title='Small Dataset Size',
+                description=f'Only {n_rows} rows available',
+                impact='High variance, poor generalization',
+                action='Collect more data or use simpler models'
+            ))
         
         # 8. High Outlier Ratio
-        outlier_features = self.report.get('distribution', {}).get('summary', {}).get('outlier_features', 0)
-        total_features = self.report.get('distribution', {}).get('summary', {}).get('total_analyzed', 1)
+        outlier_features = distribution_summary.get('outlier_features', 0)
+        total_features = distribution_summary.get('total_analyzed', 0)
         
-        if outlier_features / total_features > 0.3 if total_features > 0 else False:
-            risks.append({
-                'type': 'HIGH_OUTLIERS',
-                'severity': 'medium',
-                'priority': 3,
-                'title': 'High Outlier Ratio',
-                'description': f'{outlier_features} features have significant outliers (>5%)',
-                'impact': 'May skew model predictions',
-                'action': 'Review outliers for data errors or consider robust scaling'
-            })
+        # More than 30% of analyzed features; integer form avoids the division
+        if total_features and outlier_features * 10 > total_features * 3:
+            risks.append(Risk(
+                type='HIGH_OUTLIERS',
+                severity='medium',
+                priority=3,
+                title='High Outlier Ratio',
+                description=f'{outlier_features} features have significant outliers (>5%)',
+                impact='May skew model predictions',
+                action='Review outliers for data errors or consider robust scaling'
+            ))
         
         # 9. Moderate Overfitting
-        if self.report.get('baseline', {}).get('exists'):
-            baseline = self.report['baseline']
-            overfitting = baseline.get('overfitting', {})
-            
-            if overfitting.get('severity') == 'moderate':
-                risks.append({
-                    'type': 'MODERATE_OVERFITTING',
-                    'severity': 'medium',
-                    'priority': 3,
-                    'title': 'Moderate Overfitting',
-                    'description': 'Noticeable train-test performance gap',
-                    'impact': 'Model may not generalize well',
-                    'action': 'Add regularization or increase data size'
-                })
-        
-        # Sort by priority, then severity
-        severity_order = {'critical': 0, 'high': 1, 'medium': 2, 'low': 3}
-        risks.sort(key=lambda x: (x['priority'], severity_order.get(x['severity'], 99)))
+        if overfitting_severity == 'moderate':
+            risks.append(Risk(
+                type='MODERATE_OVERFITTING',
+                severity='medium',
+                priority=3,
+                title='Moderate Overfitting',
+                description='Noticeable train-test performance gap',
+                impact='Model may not generalize well',
+                action='Add regularization or increase data size'
+            ))
         
-        return risks
+        # Rank by priority, then severity; ties keep detection order
+        return heapq.nsmallest(limit, risks, key=lambda x: (x.priority, _SEVERITY_ORDER.get(x.severity, 99)))
     
     def _generate_recommendations(self, risks):
         """Generate actionable recommendations based on risks."""
         recommendations = []
+        top_types = {r.type for r in risks[:3]}
         
         # Group by action type
-        if any(r['type'].endswith('LEAKAGE') for r in risks[:3]):
+        if not top_types.isdisjoint(('CRITICAL_LEAKAGE', 'HIGH_RISK_LEAKAGE')):
             recommendations.append({
                 'category': 'Data Leakage',
                 'priority': 'critical',
@@ -256,7 +284,7 @@ class ReportGenerator:
                 ]
             })
         
-        if any(r['type'] in ['HIGH_MISSING', 'TARGET_MISSING'] for r in risks[:3]):
+        if not top_types.isdisjoint(('HIGH_MISSING', 'TARGET_MISSING')):
             recommendations.append({
                 'category': 'Missing Data',
                 'priority': 'high',
@@ -268,7 +296,7 @@ class ReportGenerator:
                 ]
             })
         
-        if any(r['type'] in ['SEVERE_OVERFITTING', 'MODERATE_OVERFITTING'] for r in risks[:3]):
+        if not top_types.isdisjoint(('SEVERE_OVERFITTING', 'MODERATE_OVERFITTING')):
             recommendations.append({
                 'category': 'Model Generalization',
                 'priority': 'high',
@@ -280,7 +308,7 @@ class ReportGenerator:
                 ]
             })
         
-        if any(r['type'] == 'SEVERE_IMBALANCE' for r in risks[:3]):
+        if 'SEVERE_IMBALANCE' in top_types:
             recommendations.append({
                 'category': 'Class Imbalance',
                 'priority': 'medium',
@@ -1,8 +1,33 @@
 import pandas as pd
+from collections import Counter
+from types import MappingProxyType
 from typing import Dict, Any, List
 from ops.cleaning_ops import CleaningOperations
 from ops.feature_ops import FeatureOperations
 
+# Operation names mapped to their functions, shared by every executor
+_OPERATIONS = MappingProxyType({
+    # Cleaning operations
+    "drop_duplicates": CleaningOperations.drop_duplicates,
+    "drop_columns": CleaningOperations.drop_columns,
+    "fill_missing": CleaningOperations.fill_missing,
+    "remove_outliers": CleaningOperations.remove_outliers,
+    "filter_rows": CleaningOperations.filter_rows,
+    "sort_by": CleaningOperations.sort_by,
+    "handle_missing_rows": CleaningOperations.handle_missing_rows,
+    "handle_missing_columns": CleaningOperations.handle_missing_columns,
+    
+    # Feature operations
+    "scale_numeric": FeatureOperations.scale_numeric,
+    "encode_categorical": FeatureOperations.encode_categorical,
+    "create_feature": FeatureOperations.create_feature,
+    "extract_datetime_features": FeatureOperations.extract_datetime_features,
+    "create_text_features": FeatureOperations.create_text_features,
+    "aggregate_features": FeatureOperations.aggregate_features,
+    "handle_high_cardinality": FeatureOperations.handle_high_cardinality
+})
+
+
 class PipelineExecutor:
     """
     Deterministic execution engine for preprocessing pipelines.
@@ -10,27 +35,8 @@ class PipelineExecutor:
     """
     
     def __init__(self):
-        # Map operation names to functions
-        self.operations = {
-            # Cleaning operations
-            "drop_duplicates": CleaningOperations.drop_duplicates,
-            "drop_columns": CleaningOperations.drop_columns,
-            "fill_missing": CleaningOperations.fill_missing,
-            "remove_outliers": CleaningOperations.remove_outliers,
-            "filter_rows": CleaningOperations.filter_rows,
-            "sort_by": CleaningOperations.sort_by,
-            "handle_missing_rows": CleaningOperations.handle_missing_rows,
-            "handle_missing_columns": CleaningOperations.handle_missing_columns,
-            
-            # Feature operations
-            "scale_numeric": FeatureOperations.scale_numeric,
-            "encode_categorical": FeatureOperations.encode_categorical,
-            "create_feature": FeatureOperations.create_feature,
-            "extract_datetime_features": FeatureOperations.extract_datetime_features,
-            "create_text_features": FeatureOperations.create_text_features,
-            "aggregate_features": FeatureOperations.aggregate_features,
-            "handle_high_cardinality": FeatureOperations.handle_high_cardinality
-        }
+        # Read-only view of the shared dispatch table
+        self.operations = _OPERATIONS
     
     def execute(
         self, 
@@ -51,43 +57,31 @@ class PipelineExecutor:
         execution_log = []
         
         original_shape = df.shape
-        current_df = df.copy()
+        # Every operation returns a new frame, so the caller's df is never mutated
+        current_df = df
+        
+        # Resolve every operation up front, one lookup per step
+        resolved = [(step, _OPERATIONS.get(step.get("op"))) for step in steps]
         
         # Execute each step
-        for i, step in enumerate(steps):
+        for i, (step, operation) in enumerate(resolved):
             op_name = step.get("op")
-            params = step.get("params", {})
             
-            try:
-                # Get operation function
-                if op_name not in self.operations:
-                    execution_log.append({
-                        "step": i + 1,
-                        "operation": op_name,
-                        "status": "skipped",
-                        "reason": f"Unknown operation: {op_name}"
-                    })
-                    continue
-                
-                operation = self.operations[op_name]
-                
-                # Execute operation
-                before_shape = current_df.shape
-                current_df = operation(current_df, params)
-                after_shape = current_df.shape
-                
-                # Log execution
+            if operation is None:
                 execution_log.append({
                     "step": i + 1,
                     "operation": op_name,
-                    "params": params,
-                    "status": "success",
-                    "before_shape": before_shape,
-                    "after_shape": after_shape,
-                    "rows_changed": before_shape[0] - after_shape[0],
-                    "columns_changed": after_shape[1] - before_shape[1]
+                    "status": "skipped",
+                    "reason": f"Unknown operation: {op_name}"
                 })
-                
+                continue
+            
+            params = step.get("params", {})
+            
+            # A failed step is logged and the rest of the pipeline still runs
+            before_rows, before_cols = current_df.shape
+            try:
+                current_df = operation(current_df, params)
             except Exception as e:
                 execution_log.append({
                     "step": i + 1,
@@ -95,6 +89,19 @@ class PipelineExecutor:
                     "status": "failed",
                     "error": str(e)
                 })
+                continue
+            
+            after_rows, after_cols = current_df.shape
+            execution_log.append({
+                "step": i + 1,
+                "operation": op_name,
+                "params": params,
+                "status": "success",
+                "before_shape": (before_rows, before_cols),
+                "after_shape": (after_rows, after_cols),
+                "rows_changed": before_rows - after_rows,
+                "columns_changed": after_cols - before_cols
+            })
         
         # Generate summary
         summary = self._generate_summary(original_shape, current_df.shape, execution_log)
@@ -113,9 +120,10 @@ class PipelineExecutor:
     ) -> Dict[str, Any]:
         """Generate execution summary"""
         
-        successful_steps = sum(1 for log in execution_log if log["status"] == "success")
-        failed_steps = sum(1 for log in execution_log if log["status"] == "failed")
-        skipped_steps = sum(1 for log in execution_log if log["status"] == "skipped")
+        status_counts = Counter(log["status"] for log in execution_log)
+        successful_steps = status_counts["success"]
+        failed_steps = status_counts["failed"]
+        skipped_steps = status_counts["skipped"]
         
         rows_removed = original_shape[0] - final_shape[0]
         columns_added = final_shape[1] - original_shape[1]
@@ -141,10 +149,10 @@ class PipelineExecutor:
         op_name = step.get("op")
         params = step.get("params", {})
         
-        if op_name not in self.operations:
+        operation = _OPERATIONS.get(op_name)
+        if operation is None:
             raise ValueError(f"Unknown operation: {op_name}")
         
-        operation = self.operations[op_name]
         return operation(df, params)
     
     def dry_run(
@@ -161,16 +169,17 @@ class PipelineExecutor:
         
         # Sample data for estimation (use smaller sample for speed)
         sample_size = min(1000, len(df))
-        sample_df = df.sample(n=sample_size, random_state=42) if len(df) > sample_size else df.copy()
+        sample_df = df.sample(n=sample_size, random_state=42) if len(df) > sample_size else df
         
-        current_df = sample_df.copy()
+        current_df = sample_df
         
         for i, step in enumerate(steps):
             op_name = step.get("op")
             params = step.get("params", {})
             
             try:
-                if op_name not in self.operations:
+                operation = _OPERATIONS.get(op_name)
+                if operation is None:
                     impact_log.append({
                         "step": i + 1,
                         "operation": op_name,
@@ -179,17 +188,17 @@ class PipelineExecutor:
                     })
                     continue
                 
-                operation = self.operations[op_name]
-                before_shape = current_df.shape
+                before_rows, before_cols = current_df.shape
                 current_df = operation(current_df, params)
-                after_shape = current_df.shape
+                after_rows, after_cols = current_df.shape
+                rows_affected = before_rows - after_rows
                 
                 impact_log.append({
                     "step": i + 1,
                     "operation": op_name,
-                    "estimated_rows_affected": before_shape[0] - after_shape[0],
-                    "estimated_columns_affected": after_shape[1] - before_shape[1],
-                    "impact_percent": ((before_shape[0] - after_shape[0]) / before_shape[0] * 100) if before_shape[0] > 0 else 0
+                    "estimated_rows_affected": rows_affected,
+                    "estimated_columns_affected": after_cols - before_cols,
+                    "impact_percent": (rows_affected / before_rows * 100) if before_rows > 0 else 0
                 })
                 
             except Exception as e:
@@ -200,11 +209,12 @@ class PipelineExecutor:
                     "error": str(e)
                 })
         
+        final_rows, final_cols = current_df.shape
         return {
             "sample_size": sample_size,
             "estimated_impact": impact_log,
             "estimated_final_shape": (
-                int(df.shape[0] * (current_df.shape[0] / sample_df.shape[0])),
-                current_df.shape[1]
+                int(len(df) * (final_rows / sample_size)),
+                final_cols
             )
         }
\ No newline at end of file
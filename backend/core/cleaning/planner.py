@@ -1,47 +1,39 @@
+import hashlib
 import json
+import logging
+import os
+import tempfile
+import time
+from functools import lru_cache
 from typing import Dict, Any
 from openai import OpenAI
 from config import Config
+from core.cleaning.validator import PipelineValidator
 
-class LLMPlanner:
-    """
-    The Brain: Uses OpenAI GPT to generate data preprocessing pipelines.
-    Task-agnostic and domain-independent.
-    """
+try:
+    import orjson
+except ImportError:  # falls back to the stdlib json module
+    orjson = None
 
-    def __init__(self, api_key: str = None):
-        self.client = OpenAI(
-            api_key=api_key or Config.OPENAI_API_KEY
-        )
-        self.model = Config.MODEL_NAME
+logger = logging.getLogger(__name__)
 
-    def generate_plan(
-        self,
-        profile: Dict[str, Any],
-        purpose: Dict[str, Any],
-        target_column: str = None
-    ) -> Dict[str, Any]:
-
-        system_prompt = self._build_system_prompt()
-        user_message = self._build_user_message(profile, purpose, target_column)
 
-        response = self.client.chat.completions.create(
-            model=self.model,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_message},
-            ],
-            max_tokens=Config.MAX_TOKENS,
-            temperature=0.2,  # important for stable JSON
-        )
+def _dumps(obj: Any) -> str:
+    """Compact JSON text; orjson when available, stdlib for anything it can't encode."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+        except TypeError:
+            pass
+    return json.dumps(obj, separators=(",", ":"))
 
-        plan_text = response.choices[0].message.content
-        return self._extract_json(plan_text)
 
-    # ---------------- PROMPTS ---------------- #
+def _loads(text):
+    # orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers catch either
+    return orjson.loads(text) if orjson is not None else json.loads(text)
 
-    def _build_system_prompt(self) -> str:
-      return """You are a senior ML data engineer specializing in data preprocessing.
+# Static, so every plan request sends a byte-identical prefix the provider can cache
+SYSTEM_PROMPT = """You are a senior ML data engineer specializing in data preprocessing.
 
 Your ONLY responsibility is to DESIGN a preprocessing pipeline.
 You MUST NOT execute code or transform data.
@@ -190,6 +182,174 @@ FINAL INSTRUCTIONS
 """
 
 
+class _JSONObjectScanner:
+    """
+    Follows brace depth outside of string literals to find where the first
+    top-level JSON object in a streamed completion ends.
+    """
+
+    def __init__(self):
+        self.start = None
+        self.end = None
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+
+    def feed(self, piece: str) -> bool:
+        """Consume the next chunk of text; True once the object is complete."""
+        for ch in piece:
+            if self.start is None:
+                if ch == "{":
+                    self.start = self._pos
+                    self._depth = 1
+            elif self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif ch == "\\":
+                    self._escaped = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch in "{[":
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    self.end = self._pos + 1
+                    return True
+            self._pos += 1
+        return False
+
+
+def _plan_cache_path(key: str) -> str:
+    return os.path.join(Config.PLAN_CACHE_DIR, f"{key}.json")
+
+
+def _load_cached_plan(key: str):
+    """Cached plan for `key`, or None if missing, expired or unreadable."""
+    path = _plan_cache_path(key)
+    try:
+        if time.time() - os.path.getmtime(path) > Config.PLAN_CACHE_TTL_SECONDS:
+            os.remove(path)
+            return None
+        with open(path, "rb") as f:
+            return _loads(f.read())
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.debug("Ignoring plan cache entry %s: %s", key, e)
+        return None
+
+
+def _store_cached_plan(key: str, plan: Dict[str, Any]) -> None:
+    """Write the plan atomically so concurrent readers never see half a file."""
+    try:
+        os.makedirs(Config.PLAN_CACHE_DIR, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=Config.PLAN_CACHE_DIR, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(_dumps(plan))
+        os.replace(tmp_path, _plan_cache_path(key))
+    except (OSError, TypeError, ValueError) as e:
+        logger.debug("Could not cache plan %s: %s", key, e)
+
+
+def _evict_cached_plan(key: str) -> None:
+    try:
+        os.remove(_plan_cache_path(key))
+    except OSError:
+        pass
+
+
+@lru_cache(maxsize=4)
+def _get_client(api_key: str) -> OpenAI:
+    """One OpenAI client per key, so planners share its HTTP connection pool."""
+    return OpenAI(api_key=api_key)
+
+
+class LLMPlanner:
+    """
+    The Brain: Uses OpenAI GPT to generate data preprocessing pipelines.
+    Task-agnostic and domain-independent.
+    """
+
+    def __init__(self, api_key: str = None):
+        self.client = _get_client(api_key or Config.OPENAI_API_KEY)
+        self.model = Config.MODEL_NAME
+
+    def generate_plan(
+        self,
+        profile: Dict[str, Any],
+        purpose: Dict[str, Any],
+        target_column: str = None
+    ) -> Dict[str, Any]:
+
+        system_prompt = self._build_system_prompt()
+        user_message = self._build_user_message(profile, purpose, target_column)
+
+        # Same prompt, same model -> reuse the plan instead of another API call.
+        # Only plans that validate are cached, so a bad plan is retried, not replayed.
+        validator = PipelineValidator(profile)
+        key = self._cache_key(system_prompt, user_message)
+        plan = _load_cached_plan(key)
+        if plan is not None:
+            if validator.validate(plan)[0]:
+                return plan
+            _evict_cached_plan(key)
+
+        plan = self._complete_json(system_prompt, user_message)
+        if validator.validate(plan)[0]:
+            _store_cached_plan(key, plan)
+        return plan
+
+    def _cache_key(self, system_prompt: str, user_message: str) -> str:
+        payload = _dumps({"model": self.model, "system": system_prompt, "user": user_message})
+        return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+    def _complete_json(self, system_prompt: str, user_message: str) -> Dict[str, Any]:
+        """Stream the completion and stop reading once the top-level JSON object closes."""
+        stream = self.client.chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_message},
+            ],
+            max_tokens=Config.MAX_TOKENS,
+            temperature=0.2,  # important for stable JSON
+            stream=True,
+        )
+
+        pieces = []
+        scanner = _JSONObjectScanner()
+        try:
+            for chunk in stream:
+                if not chunk.choices:
+                    continue
+                piece = chunk.choices[0].delta.content
+                if not piece:
+                    continue
+                pieces.append(piece)
+                if scanner.feed(piece):
+                    break
+        finally:
+            # Drops the connection if we stopped early, so generation is abandoned
+            stream.close()
+
+        text = "".join(pieces)
+        if scanner.end is not None:
+            try:
+                return _loads(text[scanner.start:scanner.end])
+            except json.JSONDecodeError:
+                pass
+        return self._extract_json(text)
+
+    # ---------------- PROMPTS ---------------- #
+
+    def _build_system_prompt(self) -> str:
+        return SYSTEM_PROMPT
+
+
     def _build_user_message(
         self,
         profile: Dict[str, Any],
@@ -197,35 +357,35 @@ FINAL INSTRUCTIONS
         target_column: str = None
     ) -> str:
 
+        column_details = {
+            col: {
+                "type": details["inferred_type"],
+                "missing_percent": details["missing_percent"],
+                "unique_ratio": details["unique_ratio"]
+            }
+            for col, details in profile["columns"].items()
+        }
+
         simplified_profile = {
             "rows": profile["basic_info"]["rows"],
             "columns": profile["basic_info"]["column_names"],
             "duplicates": profile["basic_info"]["duplicates"],
             "quality": profile["quality"],
-            "column_details": {}
+            "column_details": column_details
         }
 
-        for col, details in profile["columns"].items():
-            simplified_profile["column_details"][col] = {
-                "type": details["inferred_type"],
-                "missing_percent": details["missing_percent"],
-                "unique_ratio": details["unique_ratio"]
-            }
-
-        message = f"""
-DATASET PROFILE:
-{json.dumps(simplified_profile, indent=2)}
-
-PURPOSE:
-{json.dumps(purpose, indent=2)}
-"""
+        # Joined once, so the profile JSON isn't copied again per append
+        parts = [
+            "\nDATASET PROFILE:\n", _dumps(simplified_profile),
+            "\n\nPURPOSE:\n", _dumps(purpose), "\n"
+        ]
 
         if target_column:
-            message += f"\nTARGET COLUMN: {target_column}\n"
+            parts.append(f"\nTARGET COLUMN: {target_column}\n")
 
-        message += "\nReturn ONLY valid JSON."
+        parts.append("\nReturn ONLY valid JSON.")
 
-        return message
+        return "".join(parts)
 
     # ---------------- JSON PARSER ---------------- #
 
@@ -233,12 +393,12 @@ PURPOSE:
         text = text.strip()
 
         try:
-            return json.loads(text)
+            return _loads(text)
         except json.JSONDecodeError:
             start = text.find("{")
             end = text.rfind("}") + 1
             if start != -1 and end > start:
-                return json.loads(text[start:end])
+                return _loads(text[start:end])
             raise ValueError("Failed to parse JSON from model output")
 
     # ---------------- REGENERATION ---------------- #
@@ -255,28 +415,24 @@ PURPOSE:
 
         user_message = f"""
 PREVIOUS PLAN:
-{json.dumps(previous_plan, indent=2)}
+{_dumps(previous_plan)}
 
 FEEDBACK:
 {feedback}
 
 PROFILE:
-{json.dumps(profile, indent=2)}
+{_dumps(profile)}
 
 PURPOSE:
-{json.dumps(purpose, indent=2)}
+{_dumps(purpose)}
 
 Return ONLY valid JSON.
 """
 
-        response = self.client.chat.completions.create(
-            model=self.model,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_message},
-            ],
-            max_tokens=Config.MAX_TOKENS,
-            temperature=0.2,
-        )
+        return self._complete_json(system_prompt, user_message)
+
 
-        return self._extract_json(response.choices[0].message.content)
+@lru_cache(maxsize=1)
+def get_planner() -> LLMPlanner:
+    """Shared planner, so every request reuses one OpenAI client and its connection pool."""
+    return LLMPlanner()
@@ -1,15 +1,89 @@
+import os
 import pandas as pd
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import cached_property
 from typing import Dict, Any
 
+from config import Config
+from core.analysis.context import bucket_columns, correlation_matrix, sorted_value_counts
+from core.analysis.profiler import estimate_memory_bytes
+
+# Columns are profiled independently and the per-column work is mostly
+# NumPy/pandas that drops the GIL, so wide frames fan out over threads
+_COLUMN_POOL = ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 1))
+
+# Below this many cells the thread hand-off costs more than it saves
+PARALLEL_MIN_CELLS = 100_000
+
+
+@dataclass(frozen=True)
+class _ColStats:
+    """Per-column facts worked out once and shared by the column checks."""
+    n: int
+    n_missing: int
+    n_unique: int
+    is_numeric: bool
+    is_object: bool
+    is_datetime: bool
+
+
+def _str_length(value) -> int:
+    return len(value) if type(value) is str else len(str(value))
+
+
+def _mean_str_length(series: pd.Series) -> float:
+    """
+    Mean length of the values as strings without building a string column.
+    Matches astype(str).str.len().mean() for the str/number/missing values a
+    CSV yields (missing values count as 'nan'/'None').
+    """
+    values = series.to_numpy()
+    return float(np.fromiter(map(_str_length, values), dtype=np.int64, count=len(values)).mean())
+
+
 class DatasetProfiler:
     """
     Task-independent dataset profiling engine.
     Analyzes any CSV and returns comprehensive statistics.
+    
+    Above `sample_rows` rows, numeric summaries, text-length checks and the
+    correlation matrix come from a fixed-seed row sample and are approximate;
+    row, missing, unique, duplicate and value counts stay exact.
     """
     
-    def __init__(self, df: pd.DataFrame):
+    def __init__(self, df: pd.DataFrame, ctx=None, sample_rows: int = Config.PROFILE_SAMPLE_ROWS):
         self.df = df
+        self.ctx = ctx
+        self.sample_rows = sample_rows
+    
+    @cached_property
+    def sample(self) -> pd.DataFrame:
+        """Rows the approximate statistics are computed on."""
+        if self.sample_rows and len(self.df) > self.sample_rows:
+            return self.df.sample(n=self.sample_rows, random_state=0)
+        return self.df
+    
+    @cached_property
+    def null_counts(self) -> pd.Series:
+        """Missing values per column, shared with the health analyzers via ctx."""
+        return self.ctx.null_counts if self.ctx is not None else self.df.isnull().sum()
+    
+    @cached_property
+    def nunique(self) -> pd.Series:
+        """Distinct non-null values per column."""
+        return self.ctx.nunique if self.ctx is not None else self.df.nunique()
+    
+    @cached_property
+    def numeric_cols(self) -> list:
+        """Numeric columns, same set as select_dtypes(np.number)."""
+        return self.ctx.numeric_cols if self.ctx is not None else bucket_columns(self.df.dtypes)[0]
+    
+    @cached_property
+    def duplicated(self) -> pd.Series:
+        """Row mask of repeated rows, shared by the basic info and quality metrics."""
+        return self.df.duplicated()
         
     def profile(self) -> Dict[str, Any]:
         """Generate complete dataset profile"""
@@ -27,42 +101,64 @@ class DatasetProfiler:
             "rows": len(self.df),
             "columns": len(self.df.columns),
             "column_names": list(self.df.columns),
-            "memory_usage_mb": self.df.memory_usage(deep=True).sum() / (1024 * 1024),
-            "duplicates": int(self.df.duplicated().sum())
+            "memory_usage_mb": estimate_memory_bytes(self.df) / (1024 * 1024),
+            "duplicates": int(self.duplicated.sum())
         }
     
     def _column_analysis(self) -> Dict[str, Dict[str, Any]]:
         """Detailed per-column analysis"""
-        analysis = {}
-        
-        for col in self.df.columns:
-            col_data = self.df[col]
-            
-            analysis[col] = {
-                "dtype": str(col_data.dtype),
-                "inferred_type": self._infer_type(col_data),
-                "missing_count": int(col_data.isnull().sum()),
-                "missing_percent": float(col_data.isnull().mean() * 100),
-                "unique_count": int(col_data.nunique()),
-                "unique_ratio": float(col_data.nunique() / len(col_data)) if len(col_data) > 0 else 0.0,
-                "sample_values": self._safe_sample_values(col_data)
-            }
-            
-            # Add numeric-specific stats
-            if pd.api.types.is_numeric_dtype(col_data):
-                analysis[col].update(self._numeric_stats(col_data))
-            
-            # Add categorical-specific stats
-            if col_data.nunique() < 50 or pd.api.types.is_object_dtype(col_data):
-                analysis[col].update(self._categorical_stats(col_data))
-                
+        columns = list(self.df.columns)
+        
+        if len(self.df) * len(columns) <= PARALLEL_MIN_CELLS:
+            return {col: self._analyze_column(col) for col in columns}
+        
+        # Resolve the shared state before the workers read it
+        self.null_counts, self.nunique, self.sample
+        return dict(zip(columns, _COLUMN_POOL.map(self._analyze_column, columns)))
+    
+    def _analyze_column(self, col) -> Dict[str, Any]:
+        """Profile of a single column"""
+        col_data = self.df[col]
+        sample_data = self.sample[col]
+        dtype = col_data.dtype
+        n = len(col_data)
+        stats = _ColStats(
+            n=n,
+            n_missing=int(self.null_counts[col]),
+            n_unique=int(self.nunique[col]),
+            is_numeric=pd.api.types.is_numeric_dtype(dtype),
+            is_object=pd.api.types.is_object_dtype(dtype),
+            is_datetime=pd.api.types.is_datetime64_any_dtype(dtype)
+        )
+        
+        analysis = {
+            "dtype": str(dtype),
+            "inferred_type": self._infer_type(sample_data, stats),
+            "missing_count": stats.n_missing,
+            "missing_percent": float(stats.n_missing / n * 100) if n > 0 else 0.0,
+            "unique_count": stats.n_unique,
+            "unique_ratio": float(stats.n_unique / n) if n > 0 else 0.0,
+            "sample_values": self._safe_sample_values(col_data)
+        }
+        
+        # Add numeric-specific stats
+        if stats.is_numeric:
+            analysis.update(self._numeric_stats(sample_data))
+        
+        # Add categorical-specific stats
+        if stats.n_unique < 50 or stats.is_object:
+            analysis.update(self._categorical_stats(col_data))
+        
         return analysis
     
     def _safe_sample_values(self, series: pd.Series) -> list:
         """Safely extract sample values, converting to JSON-serializable types"""
         try:
             samples = series.dropna().head(5).tolist()
-            # Convert any numpy types to native Python types
+            # tolist() already yields native scalars for typed columns;
+            # only object columns can still hold numpy values
+            if not pd.api.types.is_object_dtype(series):
+                return samples
             return [self._convert_to_json_serializable(x) for x in samples]
         except:
             return []
@@ -81,29 +177,29 @@ class DatasetProfiler:
             return value.tolist()
         return value
     
-    def _infer_type(self, series: pd.Series) -> str:
+    def _infer_type(self, series: pd.Series, stats: _ColStats) -> str:
         """Infer semantic type of column"""
         # Check if ID-like
-        if series.nunique() == len(series):
+        if stats.n_unique == stats.n:
             return "identifier"
         
         # Check if datetime
-        if pd.api.types.is_datetime64_any_dtype(series):
+        if stats.is_datetime:
             return "datetime"
         
         # Check if numeric
-        if pd.api.types.is_numeric_dtype(series):
-            if series.nunique() < 10:
+        if stats.is_numeric:
+            if stats.n_unique < 10:
                 return "categorical_numeric"
             return "numeric"
         
         # Check if categorical
-        if series.nunique() / len(series) < 0.05:
+        if stats.n_unique / stats.n < 0.05:
             return "categorical"
         
         # Check if text
-        if pd.api.types.is_object_dtype(series):
-            avg_length = series.astype(str).str.len().mean()
+        if stats.is_object:
+            avg_length = _mean_str_length(series)
             if avg_length > 50:
                 return "text"
             return "categorical"
@@ -116,60 +212,65 @@ class DatasetProfiler:
         if len(clean_data) == 0:
             return {}
         
+        # All order statistics from one percentile call instead of a sort per quantile
+        values = clean_data.to_numpy(dtype=np.float64)
+        minimum, q1, median, q3, maximum = np.percentile(values, [0, 25, 50, 75, 100])
+        if clean_data.dtype.kind == 'f' and clean_data.dtype != np.float64:
+            # Narrow floats are averaged in their own precision, as Series.median does
+            median = np.median(clean_data.to_numpy())
+        
         return {
-            "min": float(clean_data.min()),
-            "max": float(clean_data.max()),
+            "min": float(minimum),
+            "max": float(maximum),
             "mean": float(clean_data.mean()),
-            "median": float(clean_data.median()),
+            "median": float(median),
             "std": float(clean_data.std()),
-            "q25": float(clean_data.quantile(0.25)),
-            "q75": float(clean_data.quantile(0.75)),
+            "q25": float(q1),
+            "q75": float(q3),
             "skewness": float(clean_data.skew()),
-            "has_outliers": bool(self._detect_outliers(clean_data))
+            "has_outliers": self._detect_outliers(minimum, maximum, q1, q3)
         }
     
     def _categorical_stats(self, series: pd.Series) -> Dict[str, Any]:
         """Statistics for categorical columns"""
-        value_counts = series.value_counts()
+        values, counts = sorted_value_counts(series)
         
         # Convert to JSON-serializable dict
-        top_values = {}
-        for idx, val in value_counts.head(10).items():
-            top_values[str(idx)] = int(val)
+        top_values = dict(zip(map(str, values[:10]), counts[:10].tolist()))
         
         return {
             "top_values": top_values,
-            "cardinality": int(len(value_counts)),
-            "most_frequent": str(value_counts.index[0]) if len(value_counts) > 0 else None,
-            "most_frequent_count": int(value_counts.iloc[0]) if len(value_counts) > 0 else 0
+            "cardinality": int(len(counts)),
+            "most_frequent": str(values[0]) if len(counts) > 0 else None,
+            "most_frequent_count": int(counts[0]) if len(counts) > 0 else 0
         }
     
-    def _detect_outliers(self, series: pd.Series) -> bool:
+    def _detect_outliers(self, minimum: float, maximum: float, q1: float, q3: float) -> bool:
         """Detect if column has outliers using IQR method"""
-        q1 = series.quantile(0.25)
-        q3 = series.quantile(0.75)
+        # Anything past the fences means the extremes are past them too
         iqr = q3 - q1
         lower_bound = q1 - 1.5 * iqr
         upper_bound = q3 + 1.5 * iqr
-        outliers = ((series < lower_bound) | (series > upper_bound)).sum()
-        return outliers > 0
+        return bool(minimum < lower_bound or maximum > upper_bound)
     
     def _quality_metrics(self) -> Dict[str, Any]:
         """Overall data quality metrics"""
         total_cells = self.df.shape[0] * self.df.shape[1]
-        missing_cells = self.df.isnull().sum().sum()
+        null_counts = self.null_counts
+        missing_cells = null_counts.sum()
+        duplicated = self.duplicated
         
         return {
             "completeness_percent": float((1 - missing_cells / total_cells) * 100),
-            "duplicate_rows": int(self.df.duplicated().sum()),
-            "duplicate_percent": float(self.df.duplicated().mean() * 100),
-            "columns_with_missing": int((self.df.isnull().sum() > 0).sum()),
-            "fully_empty_columns": int((self.df.isnull().sum() == len(self.df)).sum())
+            "duplicate_rows": int(duplicated.sum()),
+            "duplicate_percent": float(duplicated.mean() * 100),
+            "columns_with_missing": int((null_counts > 0).sum()),
+            "fully_empty_columns": int((null_counts == len(self.df)).sum())
         }
     
     def _statistical_summary(self) -> Dict[str, Any]:
         """Statistical summary of numeric columns"""
-        numeric_df = self.df.select_dtypes(include=[np.number])
+        numeric_df = self.sample[self.numeric_cols]
         
         if numeric_df.empty:
             return {"numeric_columns": 0}
@@ -177,11 +278,10 @@ class DatasetProfiler:
         # Convert correlation matrix to JSON-serializable format
         corr_matrix = {}
         if len(numeric_df.columns) > 1:
-            corr = numeric_df.corr()
-            for col in corr.columns:
-                corr_matrix[col] = {
-                    k: float(v) for k, v in corr[col].items()
-                }
+            cols = list(numeric_df.columns)
+            corr = correlation_matrix(numeric_df)
+            for col, row in zip(cols, corr.tolist()):
+                corr_matrix[col] = dict(zip(cols, row))
         
         return {
             "numeric_columns": len(numeric_df.columns),
@@ -190,20 +290,23 @@ class DatasetProfiler:
     
     def _detect_relationships(self) -> Dict[str, Any]:
         """Detect potential relationships between columns"""
-        relationships = []
+        nunique = self.nunique
+        n_rows = len(self.df)
         
         # Check for potential ID columns
-        id_columns = [col for col in self.df.columns 
-                      if self.df[col].nunique() == len(self.df)]
+        is_id = nunique == n_rows
+        id_columns = nunique.index[is_id].tolist()
         
         # Check for potential foreign keys
-        for col in self.df.columns:
-            if col not in id_columns and self.df[col].nunique() < len(self.df) * 0.5:
-                relationships.append({
-                    "column": col,
-                    "type": "potential_foreign_key",
-                    "cardinality": int(self.df[col].nunique())
-                })
+        fk_candidates = nunique[~is_id & (nunique < n_rows * 0.5)]
+        relationships = [
+            {
+                "column": col,
+                "type": "potential_foreign_key",
+                "cardinality": int(cardinality)
+            }
+            for col, cardinality in fk_candidates.items()
+        ]
         
         return {
             "primary_key_candidates": id_columns,
@@ -183,10 +183,9 @@ class PurposeSchema:
         target_column: str = None
     ) -> Dict[str, Any]:
         """Add target column information to schema"""
-        enriched = schema.copy()
-        if target_column:
-            enriched["target_column"] = target_column
-        return enriched
+        if not target_column:
+            return schema
+        return {**schema, "target_column": target_column}
     
     @classmethod
     def validate_task_compatibility(
@@ -205,25 +204,22 @@ class PurposeSchema:
         columns = profile.get("basic_info", {}).get("column_names", [])
         column_analysis = profile.get("columns", {})
         
+        # One pass over the columns for every check below
+        inferred_types = {info.get("inferred_type") for info in column_analysis.values()}
+        
         # Check numeric features for tasks requiring them
         if constraints.get("scale_features"):
-            numeric_cols = [col for col, info in column_analysis.items() 
-                           if info.get("inferred_type") in ["numeric", "categorical_numeric"]]
-            if not numeric_cols:
+            if inferred_types.isdisjoint(("numeric", "categorical_numeric")):
                 warnings.append("No numeric features found for scaling")
         
         # Check for datetime in time series tasks
         if constraints.get("datetime_required"):
-            datetime_cols = [col for col, info in column_analysis.items() 
-                            if info.get("inferred_type") == "datetime"]
-            if not datetime_cols:
+            if "datetime" not in inferred_types:
                 warnings.append("No datetime column found for time series task")
         
         # Check for text columns in NLP tasks
         if constraints.get("text_column_required"):
-            text_cols = [col for col, info in column_analysis.items() 
-                        if info.get("inferred_type") == "text"]
-            if not text_cols:
+            if "text" not in inferred_types:
                 warnings.append("No text column found for NLP task")
         
         return {
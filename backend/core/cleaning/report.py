@@ -1,5 +1,14 @@
+from collections import Counter
+from types import MappingProxyType
 from typing import Dict, Any
-from datetime import datetime
+from datetime import datetime, timezone
+
+# Report metadata that never changes between reports
+_META_BASE = MappingProxyType({
+    "system": "Generic LLM-Driven Data Preparation Engine",
+    "version": "1.0.0"
+})
+
 
 class ReportGenerator:
     """
@@ -37,9 +46,8 @@ class ReportGenerator:
     def _generate_metadata() -> Dict[str, Any]:
         """Generate report metadata"""
         return {
-            "generated_at": datetime.now().isoformat(),
-            "system": "Generic LLM-Driven Data Preparation Engine",
-            "version": "1.0.0"
+            "generated_at": datetime.now(timezone.utc).isoformat(),
+            **_META_BASE
         }
     
     @staticmethod
@@ -73,10 +81,7 @@ class ReportGenerator:
         """Summarize preprocessing plan"""
         steps = plan.get("steps", [])
         
-        operation_counts = {}
-        for step in steps:
-            op = step.get("op", "unknown")
-            operation_counts[op] = operation_counts.get(op, 0) + 1
+        operation_counts = dict(Counter(step.get("op", "unknown") for step in steps))
         
         return {
             "total_steps": len(steps),
@@ -91,17 +96,16 @@ class ReportGenerator:
         summary = execution_result.get("summary", {})
         execution_log = execution_result.get("execution_log", [])
         
-        # Identify problematic steps
-        failed_steps = [
-            log for log in execution_log 
-            if log.get("status") == "failed"
-        ]
-        
-        high_impact_steps = [
-            log for log in execution_log 
-            if log.get("status") == "success" and 
-            abs(log.get("rows_changed", 0)) > summary.get("original_shape", (0, 0))[0] * 0.1
-        ]
+        # Identify problematic steps in one pass
+        high_impact_threshold = summary.get("original_shape", (0, 0))[0] * 0.1
+        failed_steps = []
+        high_impact_steps = []
+        for log in execution_log:
+            status = log.get("status")
+            if status == "failed":
+                failed_steps.append(log)
+            elif status == "success" and abs(log.get("rows_changed", 0)) > high_impact_threshold:
+                high_impact_steps.append(log)
         
         return {
             "final_shape": f"{summary.get('final_shape', (0, 0))[0]} rows × {summary.get('final_shape', (0, 0))[1]} columns",
@@ -153,14 +157,13 @@ class ReportGenerator:
         recommendations = []
         
         summary = execution_result.get("summary", {})
-        execution_log = execution_result.get("execution_log", [])
         
-        # Check for failed steps
-        failed_steps = [log for log in execution_log if log.get("status") == "failed"]
+        # Check for failed steps (already counted by the executor's summary)
+        failed_steps = summary.get("failed_steps", 0)
         if failed_steps:
             recommendations.append({
                 "type": "warning",
-                "message": f"{len(failed_steps)} step(s) failed during execution. Review failed operations."
+                "message": f"{failed_steps} step(s) failed during execution. Review failed operations."
             })
         
         # Check for high data loss
@@ -189,49 +192,51 @@ class ReportGenerator:
     @staticmethod
     def generate_text_report(report: Dict[str, Any]) -> str:
         """Generate human-readable text report"""
-        lines = []
-        
-        lines.append("=" * 60)
-        lines.append("DATA PREPROCESSING REPORT")
-        lines.append("=" * 60)
-        lines.append("")
-        
-        # Dataset summary
         ds = report.get("dataset_summary", {})
-        lines.append("ORIGINAL DATASET")
-        lines.append(f"  Shape: {ds.get('original_shape', 'Unknown')}")
-        lines.append(f"  Duplicates: {ds.get('duplicate_rows', 0)}")
-        lines.append("")
-        
-        # Task info
         task = report.get("task_info", {})
-        lines.append(f"TASK: {task.get('task_type', 'Unknown').upper()}")
-        lines.append(f"  {task.get('description', '')}")
-        lines.append("")
-        
-        # Pipeline
         plan = report.get("pipeline_plan", {})
-        lines.append(f"PREPROCESSING PIPELINE ({plan.get('total_steps', 0)} steps)")
-        for op, count in plan.get("operations_used", {}).items():
-            lines.append(f"  - {op}: {count}x")
-        lines.append("")
-        
-        # Results
         results = report.get("execution_results", {})
-        lines.append("EXECUTION RESULTS")
-        lines.append(f"  Final shape: {results.get('final_shape', 'Unknown')}")
-        lines.append(f"  Data reduction: {results.get('data_reduction', 'Unknown')}")
         exec_success = results.get("execution_success", {})
-        lines.append(f"  Successful steps: {exec_success.get('successful_steps', 0)}")
-        lines.append(f"  Failed steps: {exec_success.get('failed_steps', 0)}")
-        lines.append("")
-        
-        # Recommendations
-        lines.append("RECOMMENDATIONS")
-        for rec in report.get("recommendations", []):
-            lines.append(f"  [{rec.get('type', 'info').upper()}] {rec.get('message', '')}")
-        
-        lines.append("")
-        lines.append("=" * 60)
+        rule = "=" * 60
+        
+        lines = [
+            rule,
+            "DATA PREPROCESSING REPORT",
+            rule,
+            "",
+            
+            # Dataset summary
+            "ORIGINAL DATASET",
+            f"  Shape: {ds.get('original_shape', 'Unknown')}",
+            f"  Duplicates: {ds.get('duplicate_rows', 0)}",
+            "",
+            
+            # Task info
+            f"TASK: {task.get('task_type', 'Unknown').upper()}",
+            f"  {task.get('description', '')}",
+            "",
+            
+            # Pipeline
+            f"PREPROCESSING PIPELINE ({plan.get('total_steps', 0)} steps)",
+            *[f"  - {op}: {count}x" for op, count in plan.get("operations_used", {}).items()],
+            "",
+            
+            # Results
+            "EXECUTION RESULTS",
+            f"  Final shape: {results.get('final_shape', 'Unknown')}",
+            f"  Data reduction: {results.get('data_reduction', 'Unknown')}",
+            f"  Successful steps: {exec_success.get('successful_steps', 0)}",
+            f"  Failed steps: {exec_success.get('failed_steps', 0)}",
+            "",
+            
+            # Recommendations
+            "RECOMMENDATIONS",
+            *[
+                f"  [{rec.get('type', 'info').upper()}] {rec.get('message', '')}"
+                for rec in report.get("recommendations", [])
+            ],
+            "",
+            rule
+        ]
         
-        return "\n".join(lines)
\ No newline at end of file
+        return "\n".join(lines)
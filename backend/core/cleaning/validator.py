@@ -1,12 +1,45 @@
+import json
+import threading
+from types import MappingProxyType
 from typing import Dict, Any, List, Tuple
 
+from cachetools import LRUCache
+
+try:
+    import orjson
+except ImportError:  # falls back to the stdlib json module
+    orjson = None
+
+# Inferred types that numeric-only operations accept
+NUMERIC_TYPES = frozenset({"numeric", "categorical_numeric"})
+
+# Operations that reference a single column / a list of columns
+SINGLE_COLUMN_OPS = frozenset({"fill_missing", "remove_outliers", "sort_by"})
+MULTI_COLUMN_OPS = frozenset({"scale_numeric", "encode_categorical"})
+
+# Results are a pure function of (profile schema, plan), so the same plan
+# re-checked by /validate, /execute or a regenerate round isn't walked again
+_RESULT_CACHE = LRUCache(maxsize=128)
+_RESULT_CACHE_LOCK = threading.Lock()
+
+
+def _plan_key(plan) -> bytes:
+    """Canonical bytes for a plan, independent of key order."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(plan, option=orjson.OPT_SORT_KEYS)
+        except TypeError:
+            pass
+    return json.dumps(plan, sort_keys=True, separators=(",", ":")).encode("utf-8")
+
+
 class PipelineValidator:
     """
     Safety layer that validates LLM-generated pipelines.
     Prevents execution of invalid or dangerous operations.
     """
     
-    VALID_OPERATIONS = {
+    VALID_OPERATIONS = frozenset({
         "drop_duplicates",
         "drop_columns",
         "fill_missing",
@@ -16,20 +49,22 @@ class PipelineValidator:
         "create_feature",
         "sort_by",
         "filter_rows"
-    }
+    })
     
-    FILL_STRATEGIES = {"mean", "median", "mode", "constant", "forward", "backward"}
-    OUTLIER_METHODS = {"iqr", "zscore", "isolation_forest"}
-    SCALING_METHODS = {"standard", "minmax", "robust"}
-    ENCODING_METHODS = {"onehot", "label", "ordinal"}
+    FILL_STRATEGIES = frozenset({"mean", "median", "mode", "constant", "forward", "backward"})
+    OUTLIER_METHODS = frozenset({"iqr", "zscore", "isolation_forest"})
+    SCALING_METHODS = frozenset({"standard", "minmax", "robust"})
+    ENCODING_METHODS = frozenset({"onehot", "label", "ordinal"})
     
     def __init__(self, profile: Dict[str, Any]):
         self.profile = profile
-        self.available_columns = set(profile["basic_info"]["column_names"])
+        self.available_columns = frozenset(profile["basic_info"]["column_names"])
         self.column_types = {
             col: details["inferred_type"]
             for col, details in profile["columns"].items()
         }
+        # Everything validation reads from the profile
+        self._schema_key = (self.available_columns, frozenset(self.column_types.items()))
     
     def validate(self, plan: Dict[str, Any]) -> Tuple[bool, List[str]]:
         """
@@ -38,6 +73,24 @@ class PipelineValidator:
         Returns:
             (is_valid, list_of_errors)
         """
+        try:
+            key = (self._schema_key, _plan_key(plan))
+        except (TypeError, ValueError):
+            # Not JSON-encodable, so not cacheable; validate it as-is
+            return self._validate(plan)
+        
+        with _RESULT_CACHE_LOCK:
+            cached = _RESULT_CACHE.get(key)
+        if cached is None:
+            cached = self._validate(plan)
+            with _RESULT_CACHE_LOCK:
+                _RESULT_CACHE[key] = cached
+        
+        is_valid, errors = cached
+        return is_valid, list(errors)
+    
+    def _validate(self, plan: Dict[str, Any]) -> Tuple[bool, List[str]]:
+        """Uncached validation pass"""
         errors = []
         
         # Validate structure
@@ -80,23 +133,9 @@ class PipelineValidator:
         # Validate operation-specific parameters
         params = step.get("params", {})
         
-        if op == "drop_columns":
-            errors.extend(self._validate_drop_columns(params, prefix))
-        
-        elif op == "fill_missing":
-            errors.extend(self._validate_fill_missing(params, prefix))
-        
-        elif op == "remove_outliers":
-            errors.extend(self._validate_remove_outliers(params, prefix))
-        
-        elif op == "scale_numeric":
-            errors.extend(self._validate_scale_numeric(params, prefix))
-        
-        elif op == "encode_categorical":
-            errors.extend(self._validate_encode_categorical(params, prefix))
-        
-        elif op == "sort_by":
-            errors.extend(self._validate_sort_by(params, prefix))
+        handler = self._STEP_VALIDATORS.get(op)
+        if handler is not None:
+            errors.extend(handler(self, params, prefix))
         
         return errors
     
@@ -138,7 +177,7 @@ class PipelineValidator:
         
         # Validate strategy is compatible with column type
         col_type = self.column_types.get(column)
-        if strategy in ["mean", "median"] and col_type not in ["numeric", "categorical_numeric"]:
+        if strategy in ("mean", "median") and col_type not in NUMERIC_TYPES:
             errors.append(f"{prefix}: Cannot use {strategy} strategy on non-numeric column '{column}'")
         
         return errors
@@ -158,7 +197,7 @@ class PipelineValidator:
         
         # Must be numeric
         col_type = self.column_types.get(column)
-        if col_type not in ["numeric", "categorical_numeric"]:
+        if col_type not in NUMERIC_TYPES:
             errors.append(f"{prefix}: Cannot remove outliers from non-numeric column '{column}'")
         
         method = params.get("method", "iqr")
@@ -186,7 +225,7 @@ class PipelineValidator:
                 continue
             
             col_type = self.column_types.get(col)
-            if col_type not in ["numeric", "categorical_numeric"]:
+            if col_type not in NUMERIC_TYPES:
                 errors.append(f"{prefix}: Cannot scale non-numeric column '{col}'")
         
         method = params.get("method", "standard")
@@ -232,6 +271,16 @@ class PipelineValidator:
         
         return errors
     
+    # Operations with parameters to check, mapped to their validators
+    _STEP_VALIDATORS = MappingProxyType({
+        "drop_columns": _validate_drop_columns,
+        "fill_missing": _validate_fill_missing,
+        "remove_outliers": _validate_remove_outliers,
+        "scale_numeric": _validate_scale_numeric,
+        "encode_categorical": _validate_encode_categorical,
+        "sort_by": _validate_sort_by,
+    })
+    
     def _validate_step_order(self, steps: List[Dict]) -> List[str]:
         """Validate logical order of operations"""
         errors = []
@@ -248,12 +297,12 @@ class PipelineValidator:
                 cols = params.get("columns", [])
                 dropped_columns.update(cols)
             
-            elif op in ["fill_missing", "remove_outliers", "sort_by"]:
+            elif op in SINGLE_COLUMN_OPS:
                 col = params.get("column")
                 if col in dropped_columns:
                     errors.append(f"Step {i + 1}: References dropped column '{col}'")
             
-            elif op in ["scale_numeric", "encode_categorical"]:
+            elif op in MULTI_COLUMN_OPS:
                 cols = params.get("columns", [])
                 for col in cols:
                     if col in dropped_columns:
@@ -0,0 +1,85 @@
+import logging
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from pyarrow import csv as pa_csv
+
+logger = logging.getLogger(__name__)
+
+# Uploads at least this large are parsed with Arrow's multi-threaded CSV reader
+ARROW_CSV_MIN_BYTES = 8 << 20
+
+
+def _read_csv_arrow(stream, max_rows=None, column_types=None):
+    read_options = pa_csv.ReadOptions(use_threads=True, block_size=8 << 20)
+    convert_options = pa_csv.ConvertOptions(
+        strings_can_be_null=True,
+        column_types=column_types
+    )
+
+    if max_rows is None:
+        return pa_csv.read_csv(stream, read_options=read_options, convert_options=convert_options)
+
+    # Stream record batches so an oversized file stops parsing just past the limit
+    reader = pa_csv.open_csv(stream, read_options=read_options, convert_options=convert_options)
+    batches = []
+    n_rows = 0
+    for batch in reader:
+        batches.append(batch)
+        n_rows += batch.num_rows
+        if n_rows > max_rows:
+            break
+    return pa.Table.from_batches(batches, schema=reader.schema).slice(0, max_rows + 1)
+
+
+def read_csv_upload(stream, max_rows=None):
+    """
+    Parse an uploaded CSV into a frame with the same dtypes pd.read_csv produces.
+    Large files go through pyarrow; anything it can't match falls back to pandas.
+
+    With max_rows set, parsing stops after max_rows + 1 rows so callers can
+    reject oversized datasets without materialising them.
+    """
+    stream.seek(0, os.SEEK_END)
+    size = stream.tell()
+    stream.seek(0)
+
+    if size >= ARROW_CSV_MIN_BYTES:
+        try:
+            table = _read_csv_arrow(stream, max_rows)
+
+            # pandas keeps date-like text as strings and reads all-empty columns as
+            # float NaN; re-read any such columns with those types
+            overrides = {}
+            for field in table.schema:
+                if pa.types.is_temporal(field.type):
+                    overrides[field.name] = pa.string()
+                elif pa.types.is_null(field.type):
+                    overrides[field.name] = pa.float64()
+            if overrides:
+                stream.seek(0)
+                table = _read_csv_arrow(stream, max_rows, column_types=overrides)
+
+            names = table.column_names
+            # Binary columns mean invalid UTF-8; let pandas raise the usual decode error
+            has_binary = any(pa.types.is_binary(t) or pa.types.is_large_binary(t) for t in table.schema.types)
+            if not has_binary and '' not in names and len(set(names)) == len(names):
+                df = table.to_pandas()
+                # Arrow yields None for missing strings; pandas uses NaN
+                for col in df.select_dtypes(include=['object']).columns:
+                    df[col] = df[col].where(df[col].notna(), np.nan)
+                return df
+        except (pa.ArrowInvalid, UnicodeDecodeError) as e:
+            logger.debug("Arrow CSV parse failed, falling back to pandas: %s", e)
+        stream.seek(0)
+
+    # Parse straight from the upload stream; no intermediate bytes/str copies
+    return pd.read_csv(
+        stream,
+        encoding='utf-8',
+        engine='c',
+        low_memory=False,
+        nrows=max_rows + 1 if max_rows is not None else None
+    )
@@ -0,0 +1,139 @@
+import logging
+import os
+import secrets
+import shutil
+import threading
+
+import numpy as np
+import pyarrow as pa
+from pyarrow import feather
+from cachetools import TTLCache
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+SESSION_ID_BYTES = 16
+# Random bytes fetched per refill, enough for 256 session IDs
+_ID_POOL_BYTES = 4096
+_id_pool = b''
+_id_offset = 0
+_id_pool_lock = threading.Lock()
+
+
+def new_session_id():
+    """Random 32-char hex session ID, sliced from a pooled CSPRNG buffer."""
+    global _id_pool, _id_offset
+    with _id_pool_lock:
+        if _id_offset + SESSION_ID_BYTES > len(_id_pool):
+            _id_pool = secrets.token_bytes(_ID_POOL_BYTES)
+            _id_offset = 0
+        chunk = _id_pool[_id_offset:_id_offset + SESSION_ID_BYTES]
+        _id_offset += SESSION_ID_BYTES
+    return chunk.hex()
+
+
+class _SessionCache(TTLCache):
+    """TTLCache that reports every session it drops, by expiry or by size."""
+
+    def __init__(self, maxsize, ttl, on_evict):
+        super().__init__(maxsize=maxsize, ttl=ttl)
+        self._on_evict = on_evict
+
+    def expire(self, time=None):
+        expired = super().expire(time)
+        for session_id, _ in expired:
+            self._on_evict(session_id)
+        return expired
+
+    def popitem(self):
+        session_id, session = super().popitem()
+        self._on_evict(session_id)
+        return session_id, session
+
+
+class SessionStore:
+    """
+    Thread-safe in-memory store for preparation sessions.
+    Entries expire after `ttl` seconds without access; the oldest are
+    evicted once `maxsize` sessions are held.
+
+    Session DataFrames are written to Feather files under `frame_dir` and
+    memory-mapped back on demand, so only small metadata stays on the heap.
+    """
+
+    def __init__(self, maxsize: int, ttl: int, frame_dir: str):
+        self._cache = _SessionCache(maxsize, ttl, self._remove_frames)
+        self._lock = threading.RLock()
+        self._frame_dir = frame_dir
+
+    def get(self, session_id, default=None):
+        with self._lock:
+            session = self._cache.get(session_id)
+            if session is None:
+                return default
+            # Re-insert so active sessions keep sliding their expiry forward
+            self._cache[session_id] = session
+            return session
+
+    def __getitem__(self, session_id):
+        session = self.get(session_id)
+        if session is None:
+            raise KeyError(session_id)
+        return session
+
+    def __setitem__(self, session_id, session):
+        with self._lock:
+            self._cache[session_id] = session
+
+    def __contains__(self, session_id):
+        with self._lock:
+            return session_id in self._cache
+
+    def __len__(self):
+        with self._lock:
+            return len(self._cache)
+
+    def pop(self, session_id, default=None):
+        with self._lock:
+            session = self._cache.pop(session_id, default)
+        self._remove_frames(session_id)
+        return session
+
+    def save_frame(self, session_id, name, df):
+        """Persist `df` as session[name]; kept in memory if Arrow can't encode it."""
+        session = self[session_id]
+        session_dir = os.path.join(self._frame_dir, session_id)
+        path = os.path.join(session_dir, f"{name}.arrow")
+
+        try:
+            os.makedirs(session_dir, exist_ok=True)
+            feather.write_feather(pa.Table.from_pandas(df, preserve_index=True), path)
+            session[name] = path
+        except (pa.ArrowException, OSError) as e:
+            # e.g. object columns mixing numbers and strings
+            logger.debug("Keeping frame %s/%s in memory: %s", session_id, name, e)
+            session[name] = df
+
+    def load_frame(self, session_id, name):
+        """Return the DataFrame stored as session[name], or None."""
+        frame = self[session_id].get(name)
+        if not isinstance(frame, str):
+            return frame
+
+        df = feather.read_table(frame, memory_map=True).to_pandas()
+        # Feather hands back None for missing strings where pandas had NaN
+        for col in df.select_dtypes(include=['object']).columns:
+            df[col] = df[col].where(df[col].notna(), np.nan)
+        return df
+
+    def _remove_frames(self, session_id):
+        shutil.rmtree(os.path.join(self._frame_dir, session_id), ignore_errors=True)
+
+
+# Shared by the preparation and workflow blueprints
+sessions = SessionStore(
+    maxsize=Config.SESSION_MAX_ENTRIES,
+    ttl=Config.SESSION_TTL_SECONDS,
+    frame_dir=Config.SESSION_DIR
+)
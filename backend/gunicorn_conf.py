@@ -0,0 +1,30 @@
+"""
+Gunicorn settings for production.
+
+    gunicorn -c gunicorn_conf.py app:app
+
+Threaded workers rather than gevent: the analyzers are CPU-bound pandas/sklearn
+work that runs on thread and process pools, which gevent's monkey-patching
+would turn into cooperative greenlets. Auth0 calls already release the GIL
+while waiting on the network, so threads overlap them just as well.
+
+Preparation sessions are held in process memory, so requests for one session
+must land on the same worker. Keep WEB_CONCURRENCY at 1 unless sessions move
+to a shared store; scale with GUNICORN_THREADS instead.
+"""
+
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+
+workers = int(os.getenv("WEB_CONCURRENCY", 1))
+worker_class = "gthread"
+threads = int(os.getenv("GUNICORN_THREADS", 16))
+
+keepalive = 30
+# /analyze trains models on the upload; give it room before the worker is killed
+timeout = 120
+graceful_timeout = 30
+
+accesslog = "-"
+loglevel = os.getenv("LOG_LEVEL", "info").lower()
@@ -3,11 +3,22 @@ Dataset health analysis endpoints with report saving.
 """
 
 from flask import Blueprint, request, jsonify
+from werkzeug.exceptions import RequestEntityTooLarge
 import pandas as pd
+import numpy as np
+import pyarrow as pa
 import io
+import logging
+import multiprocessing
+import os
+import pickle
 import sys
 import traceback
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 
+from config import Config
+from core.csv_upload import read_csv_upload
+from core.analysis.context import AnalysisContext
 from core.analysis.profiler import DatasetProfiler as HealthProfiler
 from core.analysis.missing import MissingAnalyzer
 from core.analysis.features import FeatureQuality
@@ -21,6 +32,93 @@ from database.user import get_db
 from database.analysis import save_analysis_report
 
 analysis_bp = Blueprint('analysis', __name__)
+logger = logging.getLogger(__name__)
+
+# Shared across requests; analyzers are mostly NumPy/pandas work that drops the GIL
+_ANALYSIS_POOL = ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 1))
+
+
+# One ML worker per two cores, each held to its share of the CPUs so that
+# concurrent requests don't stack n_jobs=-1 pools on top of each other
+ML_WORKERS = max(1, (os.cpu_count() or 2) // 2)
+ML_THREADS_PER_WORKER = max(1, (os.cpu_count() or 1) // ML_WORKERS)
+
+
+def _preload_ml_modules():
+    """Import the ML analyzers once per worker process and cap their threads."""
+    # joblib resolves n_jobs=-1 against this
+    os.environ['LOKY_MAX_CPU_COUNT'] = str(ML_THREADS_PER_WORKER)
+
+    import core.analysis.baseline  # noqa: F401
+    import core.analysis.leakage  # noqa: F401
+
+    # OpenMP/BLAS pools (histogram boosting) are loaded by now; cap them too
+    from threadpoolctl import threadpool_limits
+    threadpool_limits(limits=ML_THREADS_PER_WORKER)
+
+
+# The sklearn analyzers hold the GIL for long stretches, so they get their own processes
+_ML_POOL = ProcessPoolExecutor(
+    max_workers=ML_WORKERS,
+    mp_context=multiprocessing.get_context('forkserver'),
+    initializer=_preload_ml_modules
+)
+
+
+def _to_frame_bytes(df):
+    """
+    Serialize df for the ML workers: Parquet when Arrow can type every column,
+    pickle for the rest (e.g. object columns mixing ints and strings).
+    """
+    buffer = io.BytesIO()
+    try:
+        df.to_parquet(buffer, engine='pyarrow')
+    except (pa.ArrowException, ValueError) as e:
+        logger.debug("Falling back to pickle for the ML copy: %s", e)
+        return pickle.dumps(df, protocol=pickle.HIGHEST_PROTOCOL)
+    return buffer.getvalue()
+
+
+def _from_frame_bytes(df_bytes):
+    if df_bytes[:4] == b'PAR1':
+        return pd.read_parquet(io.BytesIO(df_bytes), engine='pyarrow')
+    return pickle.loads(df_bytes)
+
+
+def _run_baseline(df_bytes, target_col):
+    return BaselineModel(_from_frame_bytes(df_bytes), target_col).analyze()
+
+
+def _run_leakage(df_bytes, target_col):
+    return LeakageDetector(_from_frame_bytes(df_bytes), target_col).analyze()
+
+
+# Below this many cells the downcast pass costs more than it saves
+DOWNCAST_MIN_CELLS = 100_000
+
+
+def _downcast_numeric(df):
+    """
+    Shrink 64-bit numeric columns to 32-bit where no value changes.
+    Object columns are left alone: the analyzers branch on dtype == 'object'.
+    """
+    if len(df) * len(df.columns) <= DOWNCAST_MIN_CELLS:
+        return df
+
+    int32 = np.iinfo(np.int32)
+    for col in df.select_dtypes(include=['int64']).columns:
+        values = df[col]
+        if values.min() >= int32.min and values.max() <= int32.max:
+            df[col] = values.astype(np.int32)
+
+    for col in df.select_dtypes(include=['float64']).columns:
+        values = df[col]
+        narrowed = values.astype(np.float32)
+        # Only keep float32 when every value round-trips exactly
+        if narrowed.astype(np.float64).equals(values):
+            df[col] = narrowed
+
+    return df
 
 
 @analysis_bp.route('/analyze', methods=['POST'])
@@ -46,8 +144,13 @@ def analyze_dataset():
 
         # ================= READ CSV =================
         try:
-            csv_content = file.read().decode('utf-8')
-            df = pd.read_csv(io.StringIO(csv_content))
+            # Stop parsing just past the row limit
+            df = read_csv_upload(file.stream, max_rows=Config.MAX_ROWS)
+
+            if len(df) > Config.MAX_ROWS:
+                return jsonify({
+                    'error': f'Dataset too large. Maximum {Config.MAX_ROWS} rows allowed.'
+                }), 400
 
             if df.empty:
                 return jsonify({'error': 'CSV file is empty'}), 400
@@ -55,6 +158,8 @@ def analyze_dataset():
             if len(df.columns) == 0:
                 return jsonify({'error': 'CSV file has no columns'}), 400
 
+            df = _downcast_numeric(df)
+
         except UnicodeDecodeError:
             return jsonify({'error': 'CSV must be UTF-8 encoded'}), 400
         except pd.errors.EmptyDataError:
@@ -72,28 +177,39 @@ def analyze_dataset():
         analysis_report = {}
 
         # ================= ANALYSIS PIPELINE =================
-        try:
-            profiler = HealthProfiler(df)
-            analysis_report['profile'] = profiler.profile()
-
-            missing = MissingAnalyzer(df, target_col)
-            analysis_report['missing'] = missing.analyze()
-
-            features = FeatureQuality(df, target_col)
-            analysis_report['features'] = features.analyze()
-
-            distribution = DistributionAnalyzer(df, target_col)
-            analysis_report['distribution'] = distribution.analyze()
-
-            imbalance = ImbalanceAnalyzer(df, target_col)
-            analysis_report['imbalance'] = imbalance.analyze()
+        # The analyzers only read df, so they can run side by side
+        # (the ML analyzers run out of process and rebuild what little they need)
+        df_bytes = _to_frame_bytes(df)
+        ctx = AnalysisContext.build(df, target_col)
+        futures = {
+            'profile': _ANALYSIS_POOL.submit(lambda: HealthProfiler(df, ctx=ctx).profile()),
+            'missing': _ANALYSIS_POOL.submit(lambda: MissingAnalyzer(df, target_col, ctx=ctx).analyze()),
+            'features': _ANALYSIS_POOL.submit(lambda: FeatureQuality(df, target_col, ctx=ctx).analyze()),
+            'distribution': _ANALYSIS_POOL.submit(lambda: DistributionAnalyzer(df, target_col, ctx=ctx).analyze()),
+            'imbalance': _ANALYSIS_POOL.submit(lambda: ImbalanceAnalyzer(df, target_col, ctx=ctx).analyze()),
+            'leakage': _ML_POOL.submit(_run_leakage, df_bytes, target_col),
+            'baseline': _ML_POOL.submit(_run_baseline, df_bytes, target_col),
+        }
 
-            leakage = LeakageDetector(df, target_col)
-            analysis_report['leakage'] = leakage.analyze()
+        # Wait for every analyzer before reporting, so none is left running
+        errors = {}
+        for section, future in futures.items():
+            try:
+                analysis_report[section] = future.result()
+            except Exception as e:
+                errors[section] = e
 
-            baseline = BaselineModel(df, target_col)
-            analysis_report['baseline'] = baseline.analyze()
+        if errors:
+            section, e = next(iter(errors.items()))
+            return jsonify({
+                'error': 'Analysis failed',
+                'failed_section': section,
+                'details': str(e),
+                'failed_analyzers': {k: str(v) for k, v in errors.items()},
+                'traceback': ''.join(traceback.format_exception(e))
+            }), 500
 
+        try:
             scorer = HealthScorer(analysis_report)
             health_score = scorer.calculate_score()
 
@@ -146,17 +262,18 @@ def analyze_dataset():
                 print("⚠️  Failed to save report to database", file=sys.stderr)
 
         # ================= DEBUG LOGS =================
-        print("\n" + "=" * 60, file=sys.stderr)
-        print("DEBUG: Health Analysis Response", file=sys.stderr)
-        print("=" * 60, file=sys.stderr)
-        print(f"Health Score: {full_response['health_score']}", file=sys.stderr)
-        print(f"Grade: {full_response['grade']}", file=sys.stderr)
-        print(f"Top Risks: {len(full_response.get('top_risks', []))}", file=sys.stderr)
-        print(f"Report ID: {report_id}", file=sys.stderr)
-        print("=" * 60 + "\n", file=sys.stderr)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "Health analysis: score=%s grade=%s top_risks=%d report_id=%s",
+                full_response['health_score'], full_response['grade'],
+                len(full_response.get('top_risks', [])), report_id
+            )
 
         return jsonify(full_response)
 
+    except RequestEntityTooLarge:
+        # Oversized upload; the app-level handler turns this into a 413
+        raise
     except Exception as e:
         return jsonify({
             'success': False,
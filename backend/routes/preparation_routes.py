@@ -2,29 +2,68 @@
 LLM-driven data preparation endpoints.
 """
 
-from flask import Blueprint, request, jsonify, send_file
-import pandas as pd
-import os
-from io import BytesIO
+import unicodedata
+from urllib.parse import quote
+
+from flask import Blueprint, Response, request, jsonify
+from werkzeug.datastructures import Headers
 from werkzeug.utils import secure_filename
 
 from config import Config
+from core.csv_upload import read_csv_upload
 from core.cleaning.profiler import DatasetProfiler as PrepProfiler
 from core.cleaning.purpose import PurposeSchema
-from core.cleaning.planner import LLMPlanner
+from core.cleaning.planner import get_planner
 from core.cleaning.validator import PipelineValidator
 from core.cleaning.executor import PipelineExecutor
 from core.cleaning.report import ReportGenerator as PrepReportGenerator
+from database.sessions import new_session_id, sessions
 
 preparation_bp = Blueprint('preparation', __name__)
 
-# Session storage (shared with main app)
-# In production, use Redis or database
-sessions = {}
+# Rows encoded per chunk when streaming a processed CSV
+DOWNLOAD_CHUNK_ROWS = 50_000
+
+
+def _attachment_headers(download_name):
+    """
+    Content-Disposition for a download, quoted and encoded the way
+    send_file(download_name=...) does it (RFC 5987 filename* for non-ASCII names).
+    """
+    try:
+        download_name.encode("ascii")
+    except UnicodeEncodeError:
+        simple = unicodedata.normalize("NFKD", download_name)
+        simple = simple.encode("ascii", "ignore").decode("ascii")
+        quoted = quote(download_name, safe="!#$&+-.^_`|~")
+        names = {"filename": simple, "filename*": f"UTF-8''{quoted}"}
+    else:
+        names = {"filename": download_name}
+    
+    headers = Headers()
+    headers.set("Content-Disposition", "attachment", **names)
+    return headers
+
+
+def _workflow_not_ready(session):
+    """
+    Error response for a session whose background /full-workflow run hasn't
+    produced a profile yet, or None when the session is ready to use.
+    """
+    status = session.get("status")
+    if status == "running":
+        return jsonify({"error": "Workflow still running", "status": status}), 409
+    if status == "failed":
+        return jsonify({
+            "error": "Workflow failed",
+            "status": status,
+            "details": session.get("error")
+        }), 409
+    return None
 
 
 def get_sessions():
-    """Get reference to sessions dict"""
+    """Get reference to the shared session store"""
     return sessions
 
 
@@ -46,8 +85,8 @@ def upload_dataset():
         return jsonify({"error": "Only CSV files are allowed"}), 400
     
     try:
-        # Read CSV
-        df = pd.read_csv(file)
+        # Read CSV, stopping just past the row limit
+        df = read_csv_upload(file.stream, max_rows=Config.MAX_ROWS)
         
         # Check size limits
         if len(df) > Config.MAX_ROWS:
@@ -56,7 +95,7 @@ def upload_dataset():
             }), 400
         
         # Generate session ID
-        session_id = os.urandom(16).hex()
+        session_id = new_session_id()
         
         # Profile dataset
         profiler = PrepProfiler(df)
@@ -64,10 +103,10 @@ def upload_dataset():
         
         # Store session data
         sessions[session_id] = {
-            "df": df,
             "profile": profile,
             "filename": secure_filename(file.filename)
         }
+        sessions.save_frame(session_id, "df", df)
         
         return jsonify({
             "session_id": session_id,
@@ -103,8 +142,12 @@ def generate_plan():
     if not task_type:
         return jsonify({"error": "task_type is required"}), 400
     
+    session = sessions[session_id]
+    not_ready = _workflow_not_ready(session)
+    if not_ready:
+        return not_ready
+    
     try:
-        session = sessions[session_id]
         profile = session['profile']
         
         # Get purpose schema
@@ -121,7 +164,7 @@ def generate_plan():
             }), 200
         
         # Generate plan using LLM
-        planner = LLMPlanner()
+        planner = get_planner()
         plan = planner.generate_plan(profile, purpose, target_column)
         
         # Validate plan
@@ -137,6 +180,7 @@ def generate_plan():
         
         # Store plan in session
         sessions[session_id]['plan'] = plan
+        sessions[session_id]['plan_validated'] = True
         sessions[session_id]['purpose'] = purpose
         
         return jsonify({
@@ -175,6 +219,10 @@ def validate_plan():
     if not plan:
         return jsonify({"error": "Plan is required"}), 400
     
+    not_ready = _workflow_not_ready(sessions[session_id])
+    if not_ready:
+        return not_ready
+    
     try:
         profile = sessions[session_id]['profile']
         
@@ -210,35 +258,44 @@ def execute_pipeline():
         return jsonify({"error": "Invalid session"}), 400
     
     session = sessions[session_id]
+    not_ready = _workflow_not_ready(session)
+    if not_ready:
+        return not_ready
     
-    # Use provided plan or stored plan
+    # Use provided plan or stored plan; stored plans from /plan and
+    # /regenerate-plan were validated when they were saved
+    already_validated = False
     if not plan:
         plan = session.get('plan')
+        already_validated = session.get('plan_validated', False)
     
     if not plan:
         return jsonify({"error": "No plan available"}), 400
     
     try:
-        df = session['df']
+        df = sessions.load_frame(session_id, 'df')
         profile = session['profile']
         
         # Validate plan first
-        validator = PipelineValidator(profile)
-        is_valid, errors = validator.validate(plan)
-        
-        if not is_valid:
-            return jsonify({
-                "error": "Invalid plan",
-                "validation_errors": errors
-            }), 400
+        if not already_validated:
+            validator = PipelineValidator(profile)
+            is_valid, errors = validator.validate(plan)
+            
+            if not is_valid:
+                return jsonify({
+                    "error": "Invalid plan",
+                    "validation_errors": errors
+                }), 400
         
         # Execute pipeline
         executor = PipelineExecutor()
         result = executor.execute(df, plan)
         
         # Store processed dataframe
-        sessions[session_id]['processed_df'] = result['processed_df']
-        sessions[session_id]['execution_result'] = result
+        sessions.save_frame(session_id, 'processed_df', result['processed_df'])
+        sessions[session_id]['execution_result'] = {
+            k: v for k, v in result.items() if k != 'processed_df'
+        }
         
         # Generate report
         purpose = session.get('purpose', {})
@@ -279,7 +336,7 @@ def dry_run():
         return jsonify({"error": "No plan available"}), 400
     
     try:
-        df = sessions[session_id]['df']
+        df = sessions.load_frame(session_id, 'df')
         
         executor = PipelineExecutor()
         impact = executor.dry_run(df, plan)
@@ -316,20 +373,20 @@ def download_processed_data():
         return jsonify({"error": "No processed data available"}), 400
     
     try:
-        df = session['processed_df']
+        df = sessions.load_frame(session_id, 'processed_df')
         
-        # Create CSV in memory
-        output = BytesIO()
-        df.to_csv(output, index=False)
-        output.seek(0)
+        # Stream the CSV a chunk of rows at a time instead of building it in memory
+        def generate():
+            yield df.iloc[:0].to_csv(index=False)
+            for start in range(0, len(df), DOWNLOAD_CHUNK_ROWS):
+                yield df.iloc[start:start + DOWNLOAD_CHUNK_ROWS].to_csv(index=False, header=False)
         
         filename = f"processed_{session['filename']}"
         
-        return send_file(
-            output,
+        return Response(
+            generate(),
             mimetype='text/csv',
-            as_attachment=True,
-            download_name=filename
+            headers=_attachment_headers(filename)
         )
         
     except Exception as e:
@@ -394,6 +451,9 @@ def regenerate_plan():
         return jsonify({"error": "Feedback is required"}), 400
     
     session = sessions[session_id]
+    not_ready = _workflow_not_ready(session)
+    if not_ready:
+        return not_ready
     
     if 'plan' not in session:
         return jsonify({"error": "No previous plan found"}), 400
@@ -403,7 +463,7 @@ def regenerate_plan():
         purpose = session['purpose']
         previous_plan = session['plan']
         
-        planner = LLMPlanner()
+        planner = get_planner()
         new_plan = planner.regenerate_plan(profile, purpose, feedback, previous_plan)
         
         # Validate new plan
@@ -412,6 +472,7 @@ def regenerate_plan():
         
         if is_valid:
             sessions[session_id]['plan'] = new_plan
+            sessions[session_id]['plan_validated'] = True
         
         return jsonify({
             "session_id": session_id,
@@ -3,30 +3,109 @@ Combined workflow endpoints.
 """
 
 from flask import Blueprint, request, jsonify
-import pandas as pd
-import io
+from werkzeug.exceptions import RequestEntityTooLarge
+from concurrent.futures import ThreadPoolExecutor
+import logging
 import os
 import traceback
 
+from config import Config
+from core.csv_upload import read_csv_upload
+from core.analysis.context import AnalysisContext
 from core.analysis.profiler import DatasetProfiler as HealthProfiler
 from core.analysis.missing import MissingAnalyzer
 from core.analysis.features import FeatureQuality
 from core.analysis.scoring import HealthScorer
 from core.cleaning.profiler import DatasetProfiler as PrepProfiler
 from core.cleaning.purpose import PurposeSchema
-from core.cleaning.planner import LLMPlanner
+from core.cleaning.planner import get_planner
+from database.sessions import new_session_id, sessions
 
 workflow_bp = Blueprint('workflow', __name__)
 
-# Session storage (shared with main app)
-sessions = {}
+logger = logging.getLogger(__name__)
 
+# Background workflows: pandas releases the GIL for most of the analysis and
+# the LLM call is network-bound, so threads keep the request thread free
+_WORKFLOW_POOL = ThreadPoolExecutor(max_workers=min(4, os.cpu_count() or 1))
+
+# The analyzers only read the frame, so one workflow's scans can overlap
+_ANALYSIS_POOL = ThreadPoolExecutor(max_workers=min(8, os.cpu_count() or 1))
 
 def get_sessions():
-    """Get reference to sessions dict"""
+    """Get reference to the shared session store"""
     return sessions
 
 
+def _run_workflow(df, target_col, task_type):
+    """Health analysis followed by LLM planning. Returns the session fields."""
+    # Step 1: Health Analysis, with the preparation profile alongside
+    ctx = AnalysisContext.build(df, target_col, sample_size=Config.SAMPLE_SIZE)
+    futures = {
+        'profile': _ANALYSIS_POOL.submit(HealthProfiler(df, ctx=ctx).profile),
+        'missing': _ANALYSIS_POOL.submit(MissingAnalyzer(df, target_col, ctx=ctx).analyze),
+        'features': _ANALYSIS_POOL.submit(FeatureQuality(df, target_col, ctx=ctx).analyze)
+    }
+    prep_future = _ANALYSIS_POOL.submit(PrepProfiler(df, ctx=ctx).profile)
+
+    health_report = {name: future.result() for name, future in futures.items()}
+    
+    scorer = HealthScorer(health_report)
+    health_score = scorer.calculate_score()
+
+    # Step 2: Preparation Pipeline
+    profile = prep_future.result()
+    
+    purpose = PurposeSchema.get_schema(task_type)
+    planner = get_planner()
+    plan = planner.generate_plan(profile, purpose, target_col)
+
+    return {
+        "profile": profile,
+        "plan": plan,
+        "purpose": purpose,
+        "health_score": health_score,
+        "health_report": health_report
+    }
+
+
+def _workflow_response(session_id, result):
+    return {
+        "success": True,
+        "session_id": session_id,
+        "health_analysis": {
+            "health_score": result["health_score"],
+            "summary": result["health_report"]
+        },
+        "preparation_plan": result["plan"],
+        "next_steps": [
+            "Review the health analysis",
+            "Modify plan if needed using /regenerate-plan",
+            "Execute pipeline using /execute"
+        ]
+    }
+
+
+def _run_workflow_task(session_id, df, target_col, task_type):
+    """Background job: fill in the session created by /full-workflow?async."""
+    try:
+        result = _run_workflow(df, target_col, task_type)
+    except Exception as e:
+        logger.exception("❌ Workflow %s failed", session_id)
+        session = sessions.get(session_id)
+        if session is not None:
+            session.update({"status": "failed", "error": str(e)})
+        return
+
+    session = sessions.get(session_id)
+    if session is None:
+        # Session expired while we were working
+        return
+    session.update({key: result[key] for key in ("profile", "plan", "purpose", "health_score")})
+    session["result"] = _workflow_response(session_id, result)
+    session["status"] = "completed"
+
+
 @workflow_bp.route('/full-workflow', methods=['POST'])
 def full_workflow():
     """
@@ -36,6 +115,7 @@ def full_workflow():
     - file: CSV file
     - target_column: target column name
     - task_type: ML task type (regression, classification, etc.)
+    - async: "true" to run in the background and poll /status/<session_id>
     """
     try:
         if 'file' not in request.files:
@@ -44,64 +124,75 @@ def full_workflow():
         file = request.files['file']
         target_col = request.form.get('target_column')
         task_type = request.form.get('task_type')
+        run_async = request.form.get('async', '').lower() in ('1', 'true', 'yes')
 
         if not task_type:
             return jsonify({'error': 'task_type is required'}), 400
 
-        # Read CSV once
-        csv_content = file.read().decode('utf-8')
-        df = pd.read_csv(io.StringIO(csv_content))
+        # Read CSV once, stopping just past the row limit
+        df = read_csv_upload(file.stream, max_rows=Config.MAX_ROWS)
 
-        # Step 1: Health Analysis
-        health_profiler = HealthProfiler(df)
-        health_report = {'profile': health_profiler.profile()}
-        
-        missing = MissingAnalyzer(df, target_col)
-        health_report['missing'] = missing.analyze()
-        
-        features = FeatureQuality(df, target_col)
-        health_report['features'] = features.analyze()
-        
-        scorer = HealthScorer(health_report)
-        health_score = scorer.calculate_score()
+        if len(df) > Config.MAX_ROWS:
+            return jsonify({
+                'error': f'Dataset too large. Maximum {Config.MAX_ROWS} rows allowed.'
+            }), 400
+        session_id = new_session_id()
 
-        # Step 2: Preparation Pipeline
-        session_id = os.urandom(16).hex()
-        prep_profiler = PrepProfiler(df)
-        profile = prep_profiler.profile()
-        
-        purpose = PurposeSchema.get_schema(task_type)
-        planner = LLMPlanner()
-        plan = planner.generate_plan(profile, purpose, target_col)
+        if run_async:
+            sessions[session_id] = {
+                "status": "running",
+                "filename": file.filename
+            }
+            sessions.save_frame(session_id, "df", df)
+            _WORKFLOW_POOL.submit(_run_workflow_task, session_id, df, target_col, task_type)
+
+            return jsonify({
+                "success": True,
+                "session_id": session_id,
+                "status": "running",
+                "status_url": f"/status/{session_id}"
+            }), 202
+
+        result = _run_workflow(df, target_col, task_type)
         
         # Store session
         sessions[session_id] = {
-            "df": df,
-            "profile": profile,
-            "plan": plan,
-            "purpose": purpose,
+            "profile": result["profile"],
+            "plan": result["plan"],
+            "purpose": result["purpose"],
             "filename": file.filename,
-            "health_score": health_score
+            "health_score": result["health_score"]
         }
+        sessions.save_frame(session_id, "df", df)
 
-        return jsonify({
-            "success": True,
-            "session_id": session_id,
-            "health_analysis": {
-                "health_score": health_score,
-                "summary": health_report
-            },
-            "preparation_plan": plan,
-            "next_steps": [
-                "Review the health analysis",
-                "Modify plan if needed using /regenerate-plan",
-                "Execute pipeline using /execute"
-            ]
-        })
+        return jsonify(_workflow_response(session_id, result))
 
+    except RequestEntityTooLarge:
+        # Oversized upload; the app-level handler turns this into a 413
+        raise
     except Exception as e:
         return jsonify({
             'success': False,
             'error': str(e),
             'traceback': traceback.format_exc()
-        }), 500
\ No newline at end of file
+        }), 500
+
+
+@workflow_bp.route('/status/<session_id>', methods=['GET'])
+def workflow_status(session_id):
+    """
+    Poll a background /full-workflow run.
+    Returns the full workflow response once it has completed.
+    """
+    session = sessions.get(session_id)
+    if session is None:
+        return jsonify({"error": "Invalid session"}), 404
+
+    status = session.get("status", "completed")
+    if status == "completed" and "result" in session:
+        return jsonify({"status": status, **session["result"]})
+
+    response = {"session_id": session_id, "status": status}
+    if status == "failed":
+        response["error"] = session.get("error")
+    return jsonify(response)